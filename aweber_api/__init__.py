@@ -6,9 +6,16 @@ from aweber_api.base import (
     API_BASE,
     AUTHORIZE_URL,
     AWeberBase,
+    NotFound,
+    RateLimited,
     REQUEST_TOKEN_URL,
+    ServerError,
+    Timeout,
+    Unauthorized,
 )
 from aweber_api.collection import AWeberCollection
+from aweber_api.deadline import Cancelled, Deadline, DeadlineExceeded
+from aweber_api.disk_cache import DiskCache
 from aweber_api.entry import AWeberEntry
 from aweber_api.oauth import OAuthAdapter
 from aweber_api.response import AWeberResponse
@@ -21,10 +28,14 @@ class AWeberAPI(AWeberBase):
     tokens for authorizing a user, or can be provided tokens and used to
     access that user's resources.
 
+    An optional DiskCache keeps reference data, ie: lists and custom
+    fields, across processes.
+
     """
 
-    def __init__(self, consumer_key, consumer_secret):
-        self.adapter = OAuthAdapter(consumer_key, consumer_secret, API_BASE)
+    def __init__(self, consumer_key, consumer_secret, cache=None):
+        self.adapter = OAuthAdapter(
+            consumer_key, consumer_secret, API_BASE, cache)
         self.adapter.user = AWeberUser()
 
     @classmethod
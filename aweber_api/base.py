@@ -1,3 +1,5 @@
+import weakref
+
 ACCESS_TOKEN_URL = 'https://auth.aweber.com/1.0/oauth/access_token'
 API_BASE = 'https://api.aweber.com/1.0'
 AUTHORIZE_URL = 'https://auth.aweber.com/1.0/oauth/authorize'
@@ -5,7 +7,48 @@ REQUEST_TOKEN_URL = 'https://auth.aweber.com/1.0/oauth/request_token'
 
 
 class APIException(Exception):
-    """APIExceptions."""
+    """APIExceptions.
+
+    Raised for error responses of the API with the HTTP status of the
+    response, its headers, and the type of the error returned by the
+    API.  retry_after is the number of seconds the API asked to wait
+    before retrying, if any.  The subclasses tell the kinds of errors
+    apart; retryable is True for the ones worth retrying.
+
+    """
+
+    retryable = False
+
+    def __init__(self, message='', status=None, error_type=None,
+                 headers=None, retry_after=None):
+        super(APIException, self).__init__(message)
+        self.status = status
+        self.error_type = error_type
+        self.headers = headers or {}
+        self.retry_after = retry_after
+
+
+class RateLimited(APIException):
+    """The API rate limited the request, ie: a 429 or a RateLimitError."""
+    retryable = True
+
+
+class NotFound(APIException):
+    """The resource does not exist, a 404."""
+
+
+class Unauthorized(APIException):
+    """The credentials were refused, a 401 or 403."""
+
+
+class ServerError(APIException):
+    """The API failed to answer, a 5xx."""
+    retryable = True
+
+
+class Timeout(APIException):
+    """No response came within the timeout of the request."""
+    retryable = True
 
 
 class AWeberBase(object):
@@ -37,36 +80,71 @@ class AWeberBase(object):
     def user(self):
         return self.adapter.user
 
-    def load_from_url(self, url):
-        """Gets an AWeberCollection or AWeberEntry from a given URL."""
-        response = self.adapter.request('GET', url)
-        return self._read_response(url, response)
+    def load_from_url(self, url, page_size=None):
+        """Gets an AWeberCollection or AWeberEntry from a given URL.
+
+        When the URL is a collection, page_size sets the number of
+        entries requested per page, including the first one.
+
+        """
+        response = self.adapter.request(
+            'GET', url, self._page_params(page_size))
+        return self._read_response(url, response, page_size)
+
+    def _page_params(self, page_size):
+        if page_size is None:
+            return {}
+        return {'ws.size': min(page_size, AWeberCollection.max_page_size)}
+
+    def _load_pages(self, url, params=None):
+        """Yield the data of each page of the collection at url.
+
+        Pages are requested one at a time by following the
+        next_collection_link of the previous page.
+
+        """
+        data = self.adapter.request('GET', url, params or {})
+        while 'entries' in data:
+            yield data
+
+            next_link = data.get('next_collection_link')
+            if not next_link:
+                return
+            data = self.adapter.request(
+                'GET', next_link.replace(API_BASE, ''))
 
     def _method_for(self, type):
         if not self.type == type:
             raise AttributeError('Method does not exist')
 
-    def _read_response(self, url, response):
+    def _read_response(self, url, response, page_size=None):
         if 'entries' in response:
-            from aweber_api.collection import AWeberCollection
-            return AWeberCollection(url, response, self.adapter)
+            return AWeberCollection(url, response, self.adapter, page_size)
 
         if 'resource_type_link' in response:
-            from aweber_api.entry import AWeberEntry
-            return AWeberEntry(url, response, self.adapter)
+            return self._get_entry(url, response)
 
         raise TypeError('Unknown value returned')
 
+    def _get_entry(self, url, data):
+        """Return the entry for url, updated with data.
+
+        The entry already loaded in the adapter's session is reused when
+        there is one, otherwise a new entry is created.
+
+        """
+        entry = self.adapter.session.get(url)
+        if entry is None:
+            return AWeberEntry(url, data, self.adapter)
+
+        entry._refresh(data)
+        return entry
+
     def _parseNamedOperation(self, data):
-        from aweber_api.entry import AWeberEntry
         entries = []
         for item in data:
             entries.append(
-                AWeberEntry(
-                    item['self_link'].replace(API_BASE, ''),
-                    item,
-                    self.adapter,
-                )
+                self._get_entry(item['self_link'].replace(API_BASE, ''), item)
             )
         return entries
 
@@ -86,3 +164,25 @@ class AWeberBase(object):
         """Remove collection id and slash from end of url."""
         url = '/'.join(url_parts[:-child_position])
         return url
+
+    def _set_parent(self, parent):
+        """Keep a weak reference to the entry this object came from."""
+        if parent is not None:
+            self._parent = weakref.ref(parent)
+
+    def _find_parent(self, url):
+        """Return the already loaded entry at url, or None.
+
+        The entry this object was navigated from is tried first, then
+        the entries in the adapter's session.
+
+        """
+        parent = self._parent and self._parent()
+        if parent is not None and parent.url == url:
+            return parent
+        return self.adapter.session.get(url)
+
+
+# Imported last, as both modules subclass AWeberBase.
+from aweber_api.collection import AWeberCollection
+from aweber_api.entry import AWeberEntry
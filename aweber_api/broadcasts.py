@@ -0,0 +1,80 @@
+from collections import namedtuple
+
+from aweber_api.base import APIException
+from aweber_api.concurrency import map_concurrently
+
+
+class BroadcastResult(namedtuple(
+        'BroadcastResult', ['list', 'broadcast_id', 'status', 'error'])):
+    """The outcome of a call for one broadcast.
+
+    status is the HTTP status returned by the API, or None when the
+    call failed with the APIException, or connection error, in error.
+
+    """
+    __slots__ = ()
+
+
+def schedule_broadcasts(broadcasts, scheduled_for, concurrency=8):
+    """Schedule many broadcasts at the same time.
+
+    broadcasts is a list of (list entry, broadcast id) pairs, as the ids
+    of broadcasts are only unique within their list.  Up to concurrency
+    broadcasts are scheduled at the same time.  A BroadcastResult is
+    returned for each pair, in order; a failure does not stop the
+    other broadcasts from being scheduled.
+
+    """
+    def schedule(list_, broadcast_id):
+        return list_.schedule_broadcast(broadcast_id, scheduled_for)
+
+    return _call_all(schedule, broadcasts, concurrency)
+
+
+def cancel_broadcasts(broadcasts, concurrency=8):
+    """Cancel many scheduled broadcasts at the same time.
+
+    Same as schedule_broadcasts, for cancel_broadcast.
+
+    """
+    def cancel(list_, broadcast_id):
+        return list_.cancel_broadcast(broadcast_id)
+
+    return _call_all(cancel, broadcasts, concurrency)
+
+
+def poll_broadcasts(lists, status, concurrency=8, **kwargs):
+    """Return the broadcasts with the given status of each of lists.
+
+    Returns a dict of the broadcast entries by list url.  The lists are
+    polled at the same time, up to concurrency at once, and the total
+    numbers of broadcasts are not requested.
+
+    """
+    def poll(list_):
+        return list_.url, list(list_.iter_broadcasts(status, **kwargs))
+
+    lists = list(lists)
+    return dict(map_concurrently(
+        poll, lists, concurrency, _get_adapter(lists)))
+
+
+def _call_all(func, broadcasts, concurrency):
+    def call(broadcast):
+        list_, broadcast_id = broadcast
+        try:
+            status = func(list_, broadcast_id)
+        except (APIException, EnvironmentError) as error:
+            return BroadcastResult(list_, broadcast_id, None, error)
+        return BroadcastResult(list_, broadcast_id, int(status), None)
+
+    broadcasts = list(broadcasts)
+    adapter = _get_adapter([list_ for list_, _ in broadcasts])
+    return map_concurrently(call, broadcasts, concurrency, adapter)
+
+
+def _get_adapter(entries):
+    # All the entries of an operation are expected to share an adapter.
+    if entries:
+        return entries[0].adapter
+    return None
@@ -0,0 +1,138 @@
+from collections import namedtuple
+import threading
+import time
+
+from aweber_api.base import APIException, NotFound, RateLimited
+from aweber_api.concurrency import map_concurrently
+
+
+class BulkResult(namedtuple('BulkResult', ['entry', 'value', 'error'])):
+    """The outcome of a bulk operation for one entry.
+
+    value is what the operation returned for the entry, ie: the new
+    location of a moved subscriber, or None when it failed with error.
+
+    """
+    __slots__ = ()
+
+
+class BulkReport(object):
+    """The results of a bulk operation, in the order of the entries."""
+
+    def __init__(self, results):
+        self.results = results
+
+    @property
+    def succeeded(self):
+        return [result for result in self.results if result.error is None]
+
+    @property
+    def failed(self):
+        return [result for result in self.results if result.error is not None]
+
+    def __len__(self):
+        return len(self.results)
+
+    def __iter__(self):
+        return iter(self.results)
+
+
+def move_many(subscribers, list_, concurrency=8, reload=True, **kwargs):
+    """Move many subscribers to list_, up to concurrency at a time.
+
+    subscribers are entries, or (entry, kwargs) pairs giving the
+    arguments of that move, ie: last_followup_message_number_sent,
+    on top of the keyword arguments for all of them.  With reload
+    False, the moved entries are not loaded again from their new
+    location, halving the requests.
+
+    Returns a BulkReport, with the new location of each moved
+    subscriber.  A failed move does not stop the others.
+
+    """
+    def move(subscriber, item_kwargs):
+        move_kwargs = dict(kwargs)
+        move_kwargs.update(item_kwargs)
+        return subscriber._move(list_, reload, **move_kwargs)
+
+    return _run(move, subscribers, concurrency)
+
+
+def delete_many(entries, concurrency=8, max_retries=5, backoff=1.0,
+                progress=None):
+    """Delete many entries, up to concurrency at a time.
+
+    An entry that is already deleted, ie: by an earlier run, counts as
+    deleted, so a purge can safely be run again.  When the API rate
+    limits a delete, all the deletes pause for backoff seconds, doubled
+    on every retry of that delete, or for as long as the API asked, and
+    the delete is retried up to max_retries times.
+
+    progress, if given, is called as progress(done, total, result)
+    after each entry.  Returns a BulkReport with the HTTP status of each
+    delete.
+
+    """
+    throttle = _Throttle()
+
+    def delete(entry, item_kwargs):
+        for retry in xrange(max_retries + 1):
+            throttle.wait()
+            try:
+                return int(entry.adapter.request(
+                    'DELETE', entry.url, response='status'))
+            except NotFound:
+                return 404
+            except RateLimited as error:
+                if retry == max_retries:
+                    raise
+                throttle.pause(
+                    max(backoff * 2 ** retry, error.retry_after or 0))
+
+    return _run(delete, entries, concurrency, progress)
+
+
+class _Throttle(object):
+    """Pauses all the workers of a bulk operation at once."""
+
+    def __init__(self):
+        self.resume_at = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        delay = self.resume_at - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        with self._lock:
+            self.resume_at = max(self.resume_at, time.time() + seconds)
+
+
+def _run(func, items, concurrency, progress=None):
+    items = list(items)
+    lock = threading.Lock()
+    done = [0]
+
+    def call(item):
+        entry, item_kwargs = item, {}
+        if isinstance(item, tuple):
+            entry, item_kwargs = item
+        try:
+            result = BulkResult(entry, func(entry, item_kwargs), None)
+        except (APIException, EnvironmentError) as error:
+            result = BulkResult(entry, None, error)
+
+        if progress is not None:
+            with lock:
+                done[0] += 1
+                progress(done[0], len(items), result)
+        return result
+
+    adapter = None
+    if items:
+        entry = items[0]
+        if isinstance(entry, tuple):
+            entry = entry[0]
+        adapter = entry.adapter
+    return BulkReport(map_concurrently(call, items, concurrency, adapter))
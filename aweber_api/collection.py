@@ -3,7 +3,9 @@ from urlparse import parse_qs
 from urllib import urlencode
 
 from aweber_api.base import API_BASE
-from aweber_api.entry import AWeberEntry
+from aweber_api.concurrency import map_concurrently
+from aweber_api.page_cache import PageCache
+from aweber_api.query import Query
 from aweber_api.response import AWeberResponse
 
 
@@ -22,10 +24,17 @@ class AWeberCollection(AWeberResponse):
     """
 
     page_size = 100
+    max_page_size = 100
+    concurrency = 1
+    max_cached_pages = 100
+    max_cached_bytes = None
 
-    def __init__(self, url, data, adapter):
-        self._entry_data = {}
+    def __init__(self, url, data, adapter, page_size=None):
+        self._pages = PageCache(self.max_cached_pages, self.max_cached_bytes)
         self._current = 0
+        self._requested_page_size = None
+        if page_size is not None:
+            self.set_page_size(page_size)
 
         super(AWeberCollection, self).__init__(url, data, adapter)
         self._key_entries(self._data)
@@ -37,33 +46,145 @@ class AWeberCollection(AWeberResponse):
         Will actually request the data from the API.
 
         """
-        return self.load_from_url("{0}/{1}".format(self.url, id))
+        entry = self.load_from_url("{0}/{1}".format(self.url, id))
+        entry._parent = self._parent
+        return entry
+
+    @property
+    def page_cache(self):
+        """The PageCache holding the pages loaded for this collection.
+
+        Bounded by the max_cached_pages and max_cached_bytes class
+        attributes, by default to the 100 most recently used pages; use
+        set_page_cache_limits to change the bounds of a single
+        collection.
+
+        """
+        return self._pages
+
+    def set_page_cache_limits(self, max_pages=None, max_bytes=None):
+        """Bound the pages kept in memory, evicting pages if needed."""
+        self._pages.set_limits(max_pages, max_bytes)
 
     def _key_entries(self, response):
-        count = 0
-        for entry in response['entries']:
-            self._entry_data[count + response['start']] = entry
-            count += 1
+        self._pages.add_page(response['start'], response['entries'])
 
     def _load_page_for_offset(self, offset):
         page = self._get_page_params(offset)
         response = self.adapter.request('GET', self.url, page)
         self._key_entries(response)
+        if not offset in self._pages:
+            # The API returned a shorter page than requested.
+            page = {'ws.start': offset, 'ws.size': page['ws.size']}
+            response = self.adapter.request('GET', self.url, page)
+            self._key_entries(response)
+            if not offset in self._pages:
+                raise ValueError(
+                    'Offset {0} was not returned by the API'.format(offset))
+
+    def set_page_size(self, page_size):
+        """Request page_size entries per page for the pages still to load.
+
+        Otherwise the page size is taken from the next_collection_link
+        returned by the API.  The page size is capped to max_page_size,
+        the most entries the API returns per page.
+
+        """
+        page_size = min(page_size, self.max_page_size)
+        self._requested_page_size = self.page_size = page_size
 
     def _get_page_params(self, offset):
         """Return the start and size of the paginated response."""
-        next_link = self._data.get('next_collection_link', None)
-        if next_link is None:
-            """no more parameters in page!"""
-            raise StopIteration
-
-        url, query = next_link.split('?')
-        query_parts = parse_qs(query)
-        self.page_size = int(query_parts['ws.size'][0])
+        if self._requested_page_size is None:
+            next_link = self._data.get('next_collection_link', None)
+            if next_link is None:
+                """no more parameters in page!"""
+                raise StopIteration
+
+            url, query = next_link.split('?')
+            query_parts = parse_qs(query)
+            self.page_size = int(query_parts['ws.size'][0])
         page_number = int(floor(offset / self.page_size))
         start = page_number * self.page_size
         return {'ws.start': start, 'ws.size': self.page_size}
 
+    def fetch_range(self, start, stop, concurrency=None):
+        """Return a CollectionSlice of the entries from start to stop.
+
+        The offsets that are not cached yet are requested with as few
+        ws.start/ws.size requests as possible, each of up to
+        max_page_size entries, or the requested page size; offsets left
+        out of shorter pages are requested again.  Up to
+        concurrency requests (by default the concurrency attribute) run
+        at the same time.  Entries are only created when the slice is
+        indexed or iterated.
+
+        """
+        start = max(start, 0)
+        stop = min(stop, self.total_size)
+        if concurrency is None:
+            concurrency = self.concurrency
+
+        data = dict((offset, self._pages.get(offset))
+                    for offset in xrange(start, stop) if offset in self._pages)
+        missing = [offset for offset in xrange(start, stop)
+                   if not offset in data]
+        while missing:
+            responses = map_concurrently(
+                self._load_range, self._get_range_params(missing),
+                concurrency=concurrency, adapter=self.adapter)
+            for response in responses:
+                self._key_entries(response)
+                for count, item in enumerate(response['entries']):
+                    data[response['start'] + count] = item
+
+            # Pages shorter than requested leave offsets to request again.
+            still_missing = [offset for offset in missing
+                             if not offset in data]
+            if len(still_missing) == len(missing):
+                raise ValueError('Offset {0} was not returned by the '
+                                 'API'.format(still_missing[0]))
+            missing = still_missing
+
+        return CollectionSlice(
+            self, [data[offset] for offset in xrange(start, stop)])
+
+    def iter_raw(self):
+        """Yield the data of each entry, as the dicts returned by the API.
+
+        Pages are loaded and cached as when iterating the collection,
+        but no entries are created, so it is much cheaper when only a
+        few fields of each entry are read.  The dicts are those of the
+        page cache, and should not be changed.
+
+        """
+        offset = 0
+        total_size = self.total_size
+        while offset < total_size:
+            data = self._pages.get_page_data(offset)
+            if data is None:
+                self._load_page_for_offset(offset)
+                data = self._pages.get_page_data(offset)
+
+            for item in data[:total_size - offset]:
+                yield item
+            offset += len(data)
+
+    def _load_range(self, params):
+        return self.adapter.request('GET', self.url, params)
+
+    def _get_range_params(self, offsets):
+        """Return the page params requesting all of offsets."""
+        size = self._requested_page_size or self.max_page_size
+        params = []
+        for offset in offsets:
+            if params and offset < params[-1]['ws.start'] + size and (
+                    offset == params[-1]['ws.start'] + params[-1]['ws.size']):
+                params[-1]['ws.size'] += 1
+            else:
+                params.append({'ws.start': offset, 'ws.size': 1})
+        return params
+
     def create(self, **kwargs):
         """Method to create an item."""
         params = {'ws.op': 'create'}
@@ -74,20 +195,35 @@ class AWeberCollection(AWeberResponse):
 
         resource_url = response['location']
         data = self.adapter.request('GET', resource_url)
-        return AWeberEntry(resource_url, data, self.adapter)
+        entry = self._get_entry(resource_url, data)
+        entry._parent = self._parent
+        return entry
+
+    def find(self, page_size=None, **kwargs):
+        """Method to request a collection.
+
+        page_size sets the number of entries requested per page.
 
-    def find(self, **kwargs):
-        """Method to request a collection."""
+        """
         params = {'ws.op': 'find'}
         params.update(kwargs)
         query_string = urlencode(params)
         url = '{0.url}?{1}'.format(self, query_string)
-        data = self.adapter.request('GET', url)
+        data = self.adapter.request('GET', url, self._page_params(page_size))
 
-        collection = AWeberCollection(url, data, self.adapter)
+        collection = AWeberCollection(url, data, self.adapter, page_size)
         collection._data['total_size'] = self._get_total_size(url)
         return collection
 
+    def query(self):
+        """Return a Query finding entries of this collection.
+
+        Unlike find, nothing is requested until the query is iterated
+        or counted.
+
+        """
+        return Query(self)
+
     def _get_total_size(self, uri, **kwargs):
         """Get actual total size number from total_size_link."""
         total_size_uri = '{0}&ws.show=total_size'.format(uri)
@@ -100,10 +236,13 @@ class AWeberCollection(AWeberResponse):
             return None
 
         url = self._construct_parent_url(url_parts, 1)
+        parent = self._find_parent(url)
+        if parent is not None:
+            return parent
 
         data = self.adapter.request('GET', url)
         try:
-            entry = AWeberEntry(url, data, self.adapter)
+            entry = self._get_entry(url, data)
 
         except TypeError:
             return None
@@ -112,9 +251,15 @@ class AWeberCollection(AWeberResponse):
 
     def _create_entry(self, offset):
         """Add an entry to the collection"""
-        data = self._entry_data[offset]
+        entry = self._entry_from_data(self._pages.get(offset))
+        self._pages.set_entry(offset, entry)
+        return entry
+
+    def _entry_from_data(self, data):
         url = data['self_link'].replace(API_BASE, '')
-        self._entries[offset] = AWeberEntry(url, data, self.adapter)
+        entry = self._get_entry(url, data)
+        entry._parent = self._parent
+        return entry
 
     def __len__(self):
         return self.total_size
@@ -131,11 +276,46 @@ class AWeberCollection(AWeberResponse):
         raise StopIteration
 
     def __getitem__(self, offset):
+        if isinstance(offset, slice):
+            offsets = xrange(*offset.indices(len(self)))
+            if not offsets:
+                return CollectionSlice(self, [])
+            start = min(offsets[0], offsets[-1])
+            data = self.fetch_range(start, max(offsets[0], offsets[-1]) + 1)
+            return CollectionSlice(
+                self, [data.data[index - start] for index in offsets])
+
         if offset < 0 or offset >= self._data['total_size']:
             raise ValueError('Offset {0} does not exist'.format(offset))
 
-        if not offset in self._entries:
-            if not offset in self._entry_data:
+        entry = self._pages.get_entry(offset)
+        if entry is None:
+            if not offset in self._pages:
                 self._load_page_for_offset(offset)
-            self._create_entry(offset)
-        return self._entries[offset]
+            entry = self._create_entry(offset)
+        return entry
+
+
+class CollectionSlice(object):
+    """A range of the entries of an AWeberCollection.
+
+    Holds the entry data of the range, and creates the entries from it
+    as they are indexed or iterated.
+
+    """
+
+    def __init__(self, collection, data):
+        self.collection = collection
+        self.data = data
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        for data in self.data:
+            yield self.collection._entry_from_data(data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return CollectionSlice(self.collection, self.data[index])
+        return self.collection._entry_from_data(self.data[index])
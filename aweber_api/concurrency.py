@@ -0,0 +1,71 @@
+def _thread_pool(processes):
+    # multiprocessing is only imported once requests run concurrently.
+    from multiprocessing.pool import ThreadPool
+    return ThreadPool(processes)
+
+
+def with_deadline(func, adapter):
+    """Return func, called within the deadline of adapter in this thread.
+
+    A deadline set with OAuthAdapter.deadline only applies to the thread
+    that set it, so calls made from worker threads enter it again.
+    Adapters without deadlines are left alone.
+
+    """
+    get_deadline = getattr(adapter, 'get_deadline', None)
+    deadline = None
+    if get_deadline is not None:
+        deadline = get_deadline()
+    if deadline is None:
+        return func
+
+    def call(*args):
+        with adapter.deadline(deadline=deadline):
+            return func(*args)
+    return call
+
+
+def map_concurrently(func, items, concurrency=1, adapter=None):
+    """Return [func(item) for item in items], using a pool of threads.
+
+    Up to concurrency calls run at the same time.  Results are returned
+    in the order of items, and the first exception raised by a call is
+    raised again once the pool has stopped.  The calls are made within
+    the deadline the calling thread has on adapter, if any.
+
+    """
+    items = list(items)
+    if concurrency is None or concurrency <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+
+    func = with_deadline(func, adapter)
+    pool = _thread_pool(min(concurrency, len(items)))
+    try:
+        return pool.map(func, items)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def imap_concurrently(func, items, concurrency=1, adapter=None):
+    """Yield func(item) for each of items, using a pool of threads.
+
+    Like map_concurrently, but results are yielded as soon as each call
+    returns, in no particular order.  The pool is stopped when the
+    generator is closed.
+
+    """
+    items = list(items)
+    if concurrency is None or concurrency <= 1 or len(items) <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    func = with_deadline(func, adapter)
+    pool = _thread_pool(min(concurrency, len(items)))
+    try:
+        for result in pool.imap_unordered(func, items):
+            yield result
+    finally:
+        pool.terminate()
+        pool.join()
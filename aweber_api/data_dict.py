@@ -2,9 +2,11 @@ class DataDict(object):
     """This class is used to propagate changes to a parent item.
 
     This is used for when an AWeberEntry has a dict item as one of the
-    attributes in _data.  When changes are made to an item in this data
-    dict, __setattr__ gets called on the parent with the new state of
-    the dict.
+    attributes in _data.  A DataDict is a view over that dict: reads and
+    writes go straight to the underlying data and only the keys that
+    are changed are tracked.  The first change made since the parent was
+    last saved calls __setattr__ on the parent with the view itself, so
+    the parent can send just the changed keys (see diff).
 
     """
 
@@ -12,10 +14,54 @@ class DataDict(object):
         self.parent = parent
         self.data = data
         self.name = name
+        self.changed = set()
 
     def __getitem__(self, key):
         return self.data[key]
 
     def __setitem__(self, key, value):
         self.data[key] = value
-        self.parent.__setattr__(self.name, self.data)
+        propagate = not self.changed
+        self.changed.add(key)
+        if propagate:
+            self.parent.__setattr__(self.name, self)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def keys(self):
+        """Return a list of the keys; iterkeys does not copy them."""
+        return self.data.keys()
+
+    def values(self):
+        return self.data.values()
+
+    def items(self):
+        """Return a list of the items; iteritems does not copy them."""
+        return self.data.items()
+
+    def iterkeys(self):
+        return self.data.iterkeys()
+
+    def itervalues(self):
+        return self.data.itervalues()
+
+    def iteritems(self):
+        return self.data.iteritems()
+
+    def diff(self):
+        """Return a dict of the keys that changed and their new values."""
+        return dict((key, self.data[key]) for key in self.changed)
+
+    def reset(self):
+        """Forget the tracked changes, ie. after they have been saved."""
+        self.changed = set()
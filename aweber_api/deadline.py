@@ -0,0 +1,55 @@
+import threading
+import time
+
+from aweber_api.base import APIException, Timeout
+
+
+class DeadlineExceeded(Timeout):
+    """Raised for requests made once their Deadline has passed."""
+    retryable = False
+
+
+class Cancelled(APIException):
+    """Raised for requests made once their Deadline was cancelled."""
+
+
+class Deadline(object):
+    """A time limit, and a cancellation flag, for a whole operation.
+
+    Set on an adapter with OAuthAdapter.deadline, it applies to the
+    requests of the thread, ie: to each page of an iterated collection.
+    Requests check the deadline before being sent, and are given no
+    more than the remaining time as their timeout.  cancel may be called
+    from any thread, and stops the operation at its next request.
+
+    """
+
+    def __init__(self, seconds=None):
+        self.expires = None
+        if seconds is not None:
+            self.expires = time.time() + seconds
+        self._cancelled = threading.Event()
+
+    def remaining(self):
+        """Return the seconds left, or None without a time limit."""
+        if self.expires is None:
+            return None
+        return max(self.expires - time.time(), 0)
+
+    @property
+    def expired(self):
+        return self.expires is not None and time.time() >= self.expires
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def check(self):
+        """Raise Cancelled or DeadlineExceeded when the operation is over."""
+        if self.cancelled:
+            raise Cancelled('Cancelled')
+        if self.expired:
+            raise DeadlineExceeded('Deadline exceeded')
@@ -0,0 +1,112 @@
+from hashlib import sha1
+import re
+import threading
+import time
+
+
+class DiskCache(object):
+    """Cache of GET responses kept in a sqlite database.
+
+    Only responses for the urls matching one of the ttls patterns are
+    cached, for the number of seconds given with the pattern.  By
+    default these are the reference data most scripts load when they
+    start: accounts, lists, custom fields and web forms.  Searches
+    made with ws.op are not cached, as their results change with the
+    data searched.
+
+    The database is opened in WAL mode, so any number of processes and
+    threads can share one file.  Each thread uses its own connection.
+
+    """
+
+    ttls = [
+        (r'^/accounts$', 3600),
+        (r'^/accounts/\d+$', 3600),
+        (r'^/accounts/\d+\?ws\.op=getWebForm(SplitTest)?s$', 3600),
+        (r'^/accounts/\d+/lists(\?(?!.*ws\.op=).*)?$', 3600),
+        (r'^/accounts/\d+/lists/\d+$', 3600),
+        (r'^/accounts/\d+/lists/\d+/custom_fields(\?(?!.*ws\.op=).*)?$', 3600),
+        (r'^/accounts/\d+/lists/\d+/web_forms(\?(?!.*ws\.op=).*)?$', 3600),
+        (r'^/accounts/\d+/lists/\d+/web_form_split_tests'
+         r'(\?(?!.*ws\.op=).*)?$', 3600),
+    ]
+
+    def __init__(self, path, ttls=None):
+        self.path = path
+        if ttls is not None:
+            self.ttls = ttls
+        self._ttls = [(re.compile(pattern), ttl) for pattern, ttl in self.ttls]
+        self._local = threading.local()
+
+        connection = self._connect()
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'key TEXT PRIMARY KEY, url TEXT, expires REAL, body BLOB)')
+        connection.commit()
+
+    def _connect(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            import sqlite3
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.text_factory = str
+            self._local.connection = connection
+        return connection
+
+    def get_ttl(self, url):
+        """Return the seconds the response for url is kept, or None."""
+        for pattern, ttl in self._ttls:
+            if pattern.search(url):
+                return ttl
+        return None
+
+    def get_key(self, url, token=None):
+        """Return the key of the response for url, seen with token."""
+        return sha1('{0}\n{1}'.format(token, url)).hexdigest()
+
+    def get(self, key):
+        """Return the cached body for key, or None once it expired."""
+        row = self._connect().execute(
+            'SELECT body FROM responses WHERE key = ? AND expires > ?',
+            (key, time.time())).fetchone()
+        if row is None:
+            return None
+        return str(row[0])
+
+    def set(self, key, url, body, ttl):
+        """Store body for key, and drop the responses that expired."""
+        now = time.time()
+        connection = self._connect()
+        connection.execute('DELETE FROM responses WHERE expires <= ?', (now,))
+        connection.execute(
+            'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)',
+            (key, url, now + ttl, buffer(body)))
+        connection.commit()
+
+    def invalidate(self, url):
+        """Drop the cached responses that a change to url may outdate.
+
+        These are the responses for the url up one level from url, and
+        for any url below it, ie: changing
+        /accounts/1/lists/2/custom_fields/3 drops the custom_fields
+        collection of the list and all of its entries.
+
+        """
+        parent_url = url.split('?')[0].rsplit('/', 1)[0]
+        escaped = self._escape(parent_url)
+        connection = self._connect()
+        connection.execute(
+            "DELETE FROM responses WHERE url = ? "
+            "OR url LIKE ? ESCAPE '\\' OR url LIKE ? ESCAPE '\\'",
+            (parent_url, escaped + '/%', escaped + '?%'))
+        connection.commit()
+
+    def _escape(self, url):
+        return url.replace('\\', '\\\\').replace('%', '\\%').replace(
+            '_', '\\_')
+
+    def clear(self):
+        connection = self._connect()
+        connection.execute('DELETE FROM responses')
+        connection.commit()
@@ -1,8 +1,11 @@
 from urllib import urlencode
+import re
 
-import aweber_api
+from aweber_api.base import API_BASE
+from aweber_api.collection import AWeberCollection
 from aweber_api.data_dict import DataDict
-from aweber_api.response import AWeberResponse
+from aweber_api.response import AWeberResponse, resource_type
+from aweber_api.traversal import traverse
 
 
 class AWeberEntry(AWeberResponse):
@@ -26,15 +29,62 @@ class AWeberEntry(AWeberResponse):
 
     """
 
+    def __new__(cls, url=None, data=None, adapter=None):
+        if cls is AWeberEntry and data is not None:
+            cls = entry_class(resource_type(data)) or cls
+        return super(AWeberEntry, cls).__new__(cls)
+
     def __init__(self, url, data, adapter):
         self._data = {}
         self._diff = {}
+        self._views = {}
         super(AWeberEntry, self).__init__(url, data, adapter)
         self._child_collections = {}
+        adapter.session.add(self)
+
+    def __reduce__(self):
+        # The classes generated for unknown types are not module
+        # attributes, so entries are pickled by type name, without their
+        # adapter and collections.
+        # Dicts changed through their views keep the changed keys, so
+        # that later changes to the view are still tracked.
+        diff, changed = {}, {}
+        for key, value in self._diff.items():
+            if isinstance(value, DataDict):
+                changed[key] = sorted(value.changed)
+            else:
+                diff[key] = value
+        state = {'url': self.url, '_data': self._data, '_diff': diff,
+                 '_changed': changed}
+        return _new_entry, (self.type,), state
+
+    def __setstate__(self, state):
+        state = dict(state)
+        changed = state.pop('_changed', {})
+        self.__dict__.update({
+            '_type': None, '_parent': None, 'adapter': None,
+            '_entries': {}, '_views': {}, '_child_collections': {}})
+        self.__dict__.update(state)
+        for key, keys in changed.items():
+            view = self._get_view(key)
+            view.changed = set(keys)
+            self._diff[key] = view
+
+    def __copy__(self):
+        entry = _new_entry(self.type)
+        entry.__dict__.update(self.__dict__)
+        return entry
 
     def __setattr__(self, key, value):
         if not key == '_data' and key in self._data:
-            self._data[key] = value
+            if value is not self._views.get(key):
+                self._data[key] = value
+                self._views.pop(key, None)
+                self._forget_field(key)
+            elif isinstance(self._diff.get(key), dict):
+                # The view changed the dict assigned as a whole, which
+                # is still to be sent whole.
+                return value
             self._diff[key] = value
             return value
         return super(AWeberEntry, self).__setattr__(key, value)
@@ -53,9 +103,12 @@ class AWeberEntry(AWeberResponse):
         self.adapter.request('DELETE', self.url, response='status')
         return True
 
-    def move(self, list_, **kwargs):
+    def move(self, list_, reload=True, **kwargs):
         """Invoke the API method to Move an entry resource to a List.
 
+        The entry is then reloaded from its new location, unless reload
+        is False; the entry is then left as it was.
+
         * Note:
             Not all entry resources are eligible to be moved, please
             refer to the AWeber API Reference Documentation at
@@ -64,21 +117,44 @@ class AWeberEntry(AWeberResponse):
             are any requirements for moving that resource.
 
         """
+        self._move(list_, reload, **kwargs)
+        return True
+
+    def _move(self, list_, reload=True, **kwargs):
+        """Move the entry to list_, and return its new location."""
         params = {'ws.op': 'move', 'list_link': list_.self_link}
         params.update(kwargs)
         response = self.adapter.request(
             'POST', self.url, params, response='headers')
 
         new_resource = response['location']
-        self._diff = {}
-        self._data = self.adapter.request('GET', new_resource)
-        return True
+        if reload:
+            self._diff = {}
+            self._set_data(self.adapter.request('GET', new_resource))
+        return new_resource
 
     def save(self):
-        self.adapter.request('PATCH', self.url, self._diff, response='status')
-        self._diff = {}
+        self.adapter.request(
+            'PATCH', self.url, self._get_diff(), response='status')
+        self._reset_diff()
         return True
 
+    def _reset_diff(self):
+        """Forget the changes, once they are saved."""
+        for value in self._diff.values() + self._views.values():
+            if isinstance(value, DataDict):
+                value.reset()
+        self._diff = {}
+
+    def _get_diff(self):
+        """Return the changed fields, with only the changed dict keys."""
+        diff = {}
+        for key, value in self._diff.items():
+            if isinstance(value, DataDict):
+                value = value.diff()
+            diff[key] = value
+        return diff
+
     def get_activity(self):
         """Invoke the API method to return all Subscriber activity.
 
@@ -95,11 +171,11 @@ class AWeberEntry(AWeberResponse):
         url = '{0.url}?{1}'.format(self, query_string)
         data = self.adapter.request('GET', url)
 
-        collection = aweber_api.AWeberCollection(url, data, self.adapter)
+        collection = AWeberCollection(url, data, self.adapter)
         collection._data['total_size'] = self._get_total_size(url)
         return collection
 
-    def findSubscribers(self, **kwargs):
+    def findSubscribers(self, page_size=None, **kwargs):
         """Invoke the API method to find all subscribers on all Lists.
 
         * Note:
@@ -109,6 +185,8 @@ class AWeberEntry(AWeberResponse):
             https://labs.aweber.com/docs/reference/1.0#account
             for more details on how to call this method.
 
+        page_size sets the number of subscribers requested per page.
+
         """
         self._method_for('account')
         params = {'ws.op': 'findSubscribers'}
@@ -116,8 +194,9 @@ class AWeberEntry(AWeberResponse):
         query_string = urlencode(params)
         url = '{0.url}?{1}'.format(self, query_string)
 
-        data = self.adapter.request('GET', url)
-        collection = aweber_api.AWeberCollection(url, data, self.adapter)
+        data = self.adapter.request('GET', url, self._page_params(page_size))
+        collection = AWeberCollection(
+            url, data, self.adapter, page_size)
         collection._data['total_size'] = self._get_total_size(url)
         return collection
 
@@ -154,11 +233,33 @@ class AWeberEntry(AWeberResponse):
         url = '{0.url}/broadcasts?{1}'.format(self, query_string)
 
         data = self.adapter.request('GET', url)
-        collection = aweber_api.AWeberCollection(url, data, self.adapter)
+        collection = AWeberCollection(url, data, self.adapter)
         collection._data['total_size'] = self._get_broadcast_count(
             query_string)
         return collection
 
+    def iter_broadcasts(self, status, **kwargs):
+        """Return an iterator of the broadcasts with the given status.
+
+        Same as get_broadcasts, but the pages are only requested as
+        they are iterated, and the total number of broadcasts is never
+        requested.
+
+        """
+        self._method_for('list')
+        params = {'status': status}
+        params.update(kwargs)
+        url = '{0.url}/broadcasts?{1}'.format(self, urlencode(params))
+        return self._iter_entries(url)
+
+    def _iter_entries(self, url):
+        for data in self._load_pages(url):
+            for item in data['entries']:
+                entry = self._get_entry(
+                    item['self_link'].replace(API_BASE, ''), item)
+                entry._set_parent(self)
+                yield entry
+
     def cancel_broadcast(self, bc_id):
         """Invoke the API method to cancel the given scheduled broadcast.
 
@@ -202,9 +303,12 @@ class AWeberEntry(AWeberResponse):
             return None
 
         url = self._construct_parent_url(url_parts, 2)
+        parent = self._find_parent(url)
+        if parent is not None:
+            return parent
 
         data = self.adapter.request('GET', url)
-        return AWeberEntry(url, data, self.adapter)
+        return self._get_entry(url, data)
 
     def get_web_forms(self):
         self._method_for('account')
@@ -218,18 +322,238 @@ class AWeberEntry(AWeberResponse):
             'GET', "{0}?ws.op=getWebFormSplitTests".format(self.url))
         return self._parseNamedOperation(data)
 
-    def _child_collection(self, attr):
+    def get_collection(self, attr, page_size=None):
+        """Return the child collection named attr, ie. 'subscribers'.
+
+        Same as reading the attribute, but page_size sets the number of
+        entries requested per page, including the first page when the
+        collection is not loaded yet.
+
+        """
+        if not attr in self.collections_map.get(self.type, []):
+            raise AttributeError(attr)
+        return self._child_collection(attr, page_size)
+
+    def traverse(self, **kwargs):
+        """Yield the entries below this entry, breadth-first.
+
+        See aweber_api.traversal.traverse for the keyword arguments.
+
+        """
+        return traverse(self, **kwargs)
+
+    def _child_collection(self, attr, page_size=None):
         if not attr in self._child_collections:
             url = "{0}/{1}".format(self.url, attr)
-            self._child_collections[attr] = self.load_from_url(url)
+            self._child_collections[attr] = self.load_from_url(url, page_size)
+            self._child_collections[attr]._set_parent(self)
+            self._remember_field(attr, self._child_collections[attr])
+        elif page_size is not None:
+            self._child_collections[attr].set_page_size(page_size)
         return self._child_collections[attr]
 
+    def _refresh(self, data):
+        """Update the entry in place with fresher data.
+
+        Nothing changes when data has the same http_etag as the current
+        data.  Unsaved changes are kept on top of the new data.
+
+        """
+        etag = data.get('http_etag')
+        if data is self._data or (
+                etag is not None and etag == self._data.get('http_etag')):
+            return
+
+        diff = self._get_diff()
+        self._diff = {}
+        self._set_data(data)
+        self.adapter.session.add(self)
+        for key, value in diff.items():
+            if not key in data:
+                continue
+            if isinstance(value, dict) and isinstance(data[key], dict):
+                view = self._get_view(key)
+                for item in value.items():
+                    view.__setitem__(*item)
+            else:
+                self.__setattr__(key, value)
+
+    def _set_data(self, data):
+        """Replace the entry data, forgetting any memoized fields."""
+        for key in self._data:
+            self._forget_field(key)
+        self._views = {}
+        self._data = data
+
+    def _remember_field(self, key, value):
+        """Memoize a field as an instance attribute.
+
+        Once memoized, reading the field is an ordinary attribute lookup
+        rather than a trip through __getattr__.  Names that would shadow
+        attributes of the entry itself are never memoized.
+
+        """
+        if not key in self._reserved:
+            self.__dict__[key] = value
+
+    def _forget_field(self, key):
+        if not key in self._reserved:
+            self.__dict__.pop(key, None)
+
+    def _get_view(self, attr):
+        if not attr in self._views:
+            self._views[attr] = DataDict(self._data[attr], attr, self)
+            self._remember_field(attr, self._views[attr])
+        return self._views[attr]
+
     def __getattr__(self, attr):
-        if attr in self._data:
-            if isinstance(self._data[attr], dict):
-                return DataDict(self._data[attr], attr, self)
-            return self._data[attr]
-        elif attr in self.collections_map[self.type]:
-            return self._child_collection(attr)
-        else:
+        try:
+            value = self._data[attr]
+        except KeyError:
+            if attr in self.collections_map.get(self.type, []):
+                return self._child_collection(attr)
             raise AttributeError(attr)
+
+        if isinstance(value, dict):
+            return self._get_view(attr)
+        self._remember_field(attr, value)
+        return value
+
+
+AWeberEntry._reserved = frozenset(dir(AWeberEntry) + ['adapter', 'url'])
+
+
+class _ChildCollection(object):
+    """Descriptor loading one of the child collections of an entry."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return instance._child_collection(self.name)
+
+
+class AccountEntry(AWeberEntry):
+    type = 'account'
+    lists = _ChildCollection('lists')
+    integrations = _ChildCollection('integrations')
+
+
+class BroadcastCampaignEntry(AWeberEntry):
+    type = 'broadcast_campaign'
+    links = _ChildCollection('links')
+    messages = _ChildCollection('messages')
+    stats = _ChildCollection('stats')
+
+
+class ComponentEntry(AWeberEntry):
+    type = 'component'
+
+
+class CustomFieldEntry(AWeberEntry):
+    type = 'custom_field'
+
+
+class FollowupCampaignEntry(AWeberEntry):
+    type = 'followup_campaign'
+    links = _ChildCollection('links')
+    messages = _ChildCollection('messages')
+    stats = _ChildCollection('stats')
+
+
+class IntegrationEntry(AWeberEntry):
+    type = 'integration'
+
+
+class LinkEntry(AWeberEntry):
+    type = 'link'
+    clicks = _ChildCollection('clicks')
+
+
+class ListEntry(AWeberEntry):
+    type = 'list'
+    campaigns = _ChildCollection('campaigns')
+    custom_fields = _ChildCollection('custom_fields')
+    subscribers = _ChildCollection('subscribers')
+    web_forms = _ChildCollection('web_forms')
+    web_form_split_tests = _ChildCollection('web_form_split_tests')
+
+
+class MessageEntry(AWeberEntry):
+    type = 'message'
+    opens = _ChildCollection('opens')
+    tracked_events = _ChildCollection('tracked_events')
+
+
+class ServiceRootEntry(AWeberEntry):
+    type = 'service-root'
+    accounts = _ChildCollection('accounts')
+
+
+class SubscriberEntry(AWeberEntry):
+    type = 'subscriber'
+
+
+class TrackedEventsEntry(AWeberEntry):
+    type = 'tracked_events'
+
+
+class WebFormEntry(AWeberEntry):
+    type = 'web_form'
+
+
+class WebFormSplitTestEntry(AWeberEntry):
+    type = 'web_form_split_test'
+    components = _ChildCollection('components')
+
+
+entry_classes = dict((cls.type, cls) for cls in [
+    AccountEntry,
+    BroadcastCampaignEntry,
+    ComponentEntry,
+    CustomFieldEntry,
+    FollowupCampaignEntry,
+    IntegrationEntry,
+    LinkEntry,
+    ListEntry,
+    MessageEntry,
+    ServiceRootEntry,
+    SubscriberEntry,
+    TrackedEventsEntry,
+    WebFormEntry,
+    WebFormSplitTestEntry,
+])
+
+
+def entry_class(type_name):
+    """Return the AWeberEntry subclass for the given resource type.
+
+    The types of AWeberBase.collections_map have the classes above.
+    Classes for other types are generated, with a descriptor for each
+    child collection of the type, and are only kept in entry_classes.
+    Fields are read from the entry data by __getattr__, the classes
+    never change once created.  Returns None when no type is given.
+
+    """
+    if type_name is None:
+        return None
+    if not type_name in entry_classes:
+        collections = AWeberEntry.collections_map.get(type_name, [])
+        if isinstance(collections, basestring):
+            collections = [collections]
+
+        attrs = {'__module__': __name__, 'type': type_name}
+        for name in collections:
+            attrs[name] = _ChildCollection(name)
+
+        name = '{0}Entry'.format(
+            ''.join(part.title() for part in re.split('[-_]', type_name)))
+        entry_classes[type_name] = type(name, (AWeberEntry,), attrs)
+    return entry_classes[type_name]
+
+
+def _new_entry(type_name):
+    """Return an empty entry of the given type, to unpickle it into."""
+    return AWeberEntry.__new__(entry_class(type_name) or AWeberEntry)
@@ -0,0 +1,38 @@
+import threading
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    # python 2.6
+    from ordereddict import OrderedDict
+
+
+class LRUCache(object):
+    """Thread safe mapping of the max_size most recently used items."""
+
+    def __init__(self, max_size=128):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._items.pop(key)
+            except KeyError:
+                return default
+            self._items[key] = value
+            return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = value
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
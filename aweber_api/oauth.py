@@ -1,19 +1,82 @@
+from contextlib import contextmanager
+from email.utils import mktime_tz, parsedate_tz
 from urllib import urlencode
+from urlparse import parse_qs, urlsplit, urlunsplit
 import json
-import os
+import socket
+import threading
+import time
+import zlib
 
-import oauth2 as oauth
+from aweber_api.base import (
+    APIException,
+    NotFound,
+    RateLimited,
+    ServerError,
+    Timeout,
+    Unauthorized,
+)
+from aweber_api.concurrency import _thread_pool
+from aweber_api.deadline import Deadline, DeadlineExceeded
+from aweber_api.lru import LRUCache
+from aweber_api.session import Session
+from aweber_api.transport import FORM_ENCODED, Httplib2Transport
 
-from aweber_api.base import APIException
+# oauth2, imported once by the first request; see _import_oauth.
+oauth = None
 
 
 class OAuthAdapter(object):
+    """Signs and sends the requests to the API.
 
-    def __init__(self, key, secret, base):
+    Requests are signed here and sent with the transport, by default an
+    Httplib2Transport; see aweber_api.transport for the others.  oauth2
+    and the transport's http library are only imported by the first
+    request, so importing aweber_api stays cheap for scripts that never
+    make a request.
+
+    Responses are requested compressed with gzip or deflate, and
+    decoded here unless the transport already did.  Request bodies of
+    at least compress_min_size bytes are sent gzipped; this is off by
+    default as the API has to accept compressed bodies.  bytes_sent and
+    bytes_received count the body bytes as they went over the wire,
+    before responses are decoded; transports that decode responses
+    themselves give that size in a -content-length header.
+
+    request_many keeps many requests outstanding at once, over up to
+    max_connections kept-alive connections, or the transport's own
+    threads when it can submit requests.
+
+    Each request times out after timeout seconds, when it is set, with
+    Timeout.  A Deadline set with deadline bounds the requests made by
+    the thread in its block, and can be cancelled from another thread.
+    Error responses raise the APIException subclass of their status.
+
+    """
+
+    accept_encoding = 'gzip, deflate'
+    compress_min_size = None
+    max_connections = 4
+    max_tokens = 64
+    timeout = None
+
+    _consumer = None
+    _signature_method = None
+
+    def __init__(self, key, secret, base, cache=None, transport=None):
         self.key = key
         self.secret = secret
-        self.consumer = oauth.Consumer(key=self.key, secret=self.secret)
         self.api_base = base
+        self.session = Session()
+        self.cache = cache
+        self.transport = transport or Httplib2Transport()
+        self._tokens = LRUCache(self.max_tokens)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self._counter_lock = threading.Lock()
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._local = threading.local()
 
     def _parse(self, response):
         try:
@@ -25,8 +88,80 @@ class OAuthAdapter(object):
             pass
         return response
 
+    @contextmanager
+    def deadline(self, seconds=None, deadline=None):
+        """Bound the requests made within the block by a Deadline.
+
+        Yields the Deadline, of seconds from now unless an existing
+        deadline is given; its cancel method stops the block at its next
+        request, with Cancelled.  Requests made once it has passed raise
+        DeadlineExceeded, ie:
+
+            with adapter.deadline(600):
+                for subscriber in list_.subscribers:
+                    ...
+
+        The deadline only applies to the current thread, so operations
+        of other threads keep their own.  Worker threads of the same
+        operation enter the block with the same deadline, as given by
+        get_deadline; request_many, traverse and the helpers of
+        aweber_api.concurrency do so themselves.
+
+        """
+        if deadline is None:
+            deadline = Deadline(seconds)
+        previous = getattr(self._local, 'deadline', None)
+        self._local.deadline = deadline
+        try:
+            yield deadline
+        finally:
+            self._local.deadline = previous
+
+    def get_deadline(self):
+        """Return the Deadline of the current thread, or None."""
+        return getattr(self._local, 'deadline', None)
+
+    def _get_timeout(self):
+        """Return the timeout of the next request, checking the deadline."""
+        deadline = self.get_deadline()
+        if deadline is None:
+            return self.timeout
+
+        deadline.check()
+        remaining = deadline.remaining()
+        if remaining is None:
+            return self.timeout
+        if remaining <= 0:
+            raise DeadlineExceeded('Deadline exceeded')
+        if self.timeout is None:
+            return remaining
+        return min(self.timeout, remaining)
+
     def request(self, method, url, data={}, response='body'):
-        client = self._get_client()
+        timeout = self._get_timeout()
+        url, body, headers, cached = self._build_request(
+            method, url, data, response)
+        if cached is not None and cached[2] is not None:
+            return self._parse(cached[2])
+
+        kwargs = {}
+        if timeout is not None:
+            kwargs['timeout'] = timeout
+        try:
+            resp, content = self.transport.request(
+                url, method, body=body, headers=headers, **kwargs)
+        except socket.timeout as error:
+            raise Timeout('Timeout: {0}'.format(error))
+        return self._read_response(
+            method, url, body, resp, content, cached, response)
+
+    def _build_request(self, method, url, data, response):
+        """Return the url, body, headers and cache entry of a request.
+
+        The request is signed, unless its response is cached; see
+        _get_cached.
+
+        """
         url = self._expand_url(url)
         body = self._prepare_request_body(method, url, data)
 
@@ -38,11 +173,26 @@ class OAuthAdapter(object):
                 url = '{0}?{1}'.format(url, body)
 
         if method == 'POST':
-            content_type = 'application/x-www-form-urlencoded'
-        headers = {'Content-Type': content_type}
+            content_type = FORM_ENCODED
+        headers = {
+            'Content-Type': content_type,
+            'Accept-Encoding': self.accept_encoding,
+        }
+
+        cached = self._get_cached(method, url, response)
+        if cached is not None and cached[2] is not None:
+            return url, body, headers, cached
 
-        resp, content = client.request(
-            url, method, body=body, headers=headers)
+        if method != 'GET':
+            body = self._compress_body(body, headers)
+        url, body, headers = self._sign(method, url, body, headers)
+        return url, body, headers, cached
+
+    def _read_response(self, method, url, body, resp, content, cached,
+                       response):
+        """Return the result of a request from its response."""
+        self._count_bytes(body, resp, content)
+        content = self._decode_content(resp, content)
 
         if int(resp['status']) >= 400:
             """
@@ -54,12 +204,12 @@ class OAuthAdapter(object):
             refer to https://labs.aweber.com/docs/troubleshooting for more
             details.
             """
-            content = json.loads(content)
-            error = content.get('error', {})
-            error_type = error.get('type')
-            error_msg = error.get('message')
-            raise APIException(
-                '{0}: {1}'.format(error_type, error_msg))
+            raise _get_error(resp, content)
+
+        if cached is not None and isinstance(content, str):
+            self.cache.set(cached[0], cached[1], content, cached[3])
+        elif method != 'GET':
+            self._invalidate_cache(url)
 
         if response == 'body' and isinstance(content, str):
             return self._parse(content)
@@ -69,20 +219,211 @@ class OAuthAdapter(object):
             return resp
         return None
 
+    def request_many(self, requests, raise_errors=True):
+        """Send many requests at the same time, and return their results.
+
+        requests are (method, url), (method, url, data) or (method, url,
+        data, response) tuples, taking the arguments of request.  They
+        are sent from a pool of max_connections threads, each keeping its
+        own connection open, so the round trips of the requests overlap.
+        Transports with a submit method, ie: ThreadedTransport, are given
+        all the signed requests at once instead.  Results are returned in
+        the order of requests.  The first APIException is raised, or with
+        raise_errors False, returned in place of the result of its
+        request.
+
+        """
+        if hasattr(self.transport, 'submit'):
+            results = self._submit_many(requests)
+        else:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = _thread_pool(self.max_connections)
+                pool = self._pool
+
+            deadline = self.get_deadline()
+            results = pool.map(self._request_or_error,
+                               [(deadline, request) for request in requests])
+        if raise_errors:
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+        return results
+
+    def _request_or_error(self, args):
+        deadline, request = args
+        try:
+            with self.deadline(deadline=deadline or Deadline()):
+                return self.request(*request)
+        except (APIException, EnvironmentError) as error:
+            return error
+
+    def _submit_many(self, requests):
+        """Submit requests to the transport, then wait for their results.
+
+        The requests are built and signed in this thread, within its
+        deadline, and sent by the transport's own threads.
+
+        """
+        waits = [_call_or_error(self._submit, *request)
+                 for request in requests]
+        return [wait if isinstance(wait, Exception) else _call_or_error(wait)
+                for wait in waits]
+
+    def _submit(self, method, url, data={}, response='body'):
+        """Submit a request, and return a function waiting for its result."""
+        timeout = self._get_timeout()
+        url, body, headers, cached = self._build_request(
+            method, url, data, response)
+        if cached is not None and cached[2] is not None:
+            result = self._parse(cached[2])
+            return lambda: result
+
+        pending = self.transport.submit(url, method, body, headers, timeout)
+
+        def wait():
+            try:
+                resp, content = pending.get()
+            except socket.timeout as error:
+                raise Timeout('Timeout: {0}'.format(error))
+            return self._read_response(
+                method, url, body, resp, content, cached, response)
+        return wait
+
+    def close(self):
+        """Stop the threads started by request_many."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool.join()
+                self._pool = None
+
+    def _compress_body(self, body, headers):
+        """Return body gzipped when it is large enough.
+
+        Form encoded bodies are left as they are, the OAuth parameters
+        of the request are in them.
+
+        """
+        if self.compress_min_size is None or not body or (
+                len(body) < self.compress_min_size or
+                headers['Content-Type'] == FORM_ENCODED):
+            return body
+
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        headers['Content-Encoding'] = 'gzip'
+        return compressor.compress(body) + compressor.flush()
+
+    def _decode_content(self, resp, content):
+        encoding = resp.get('content-encoding')
+        if encoding == 'gzip':
+            content = zlib.decompress(content, 16 + zlib.MAX_WBITS)
+        elif encoding == 'deflate':
+            try:
+                content = zlib.decompress(content)
+            except zlib.error:
+                # Some servers send a raw deflate stream, without header.
+                content = zlib.decompress(content, -zlib.MAX_WBITS)
+        else:
+            return content
+
+        resp['-content-encoding'] = resp.pop('content-encoding')
+        return content
+
+    def _count_bytes(self, body, resp, content):
+        received = resp.get('-content-length')
+        if received is None:
+            received = len(content or '')
+        with self._counter_lock:
+            self.bytes_sent += len(body or '')
+            self.bytes_received += int(received)
+
+    def _get_cached(self, method, url, response):
+        """Return the cache key, url, cached body and ttl of a request.
+
+        Returns None when the response is not to be cached.
+
+        """
+        if self.cache is None or method != 'GET' or response != 'body':
+            return None
+        if not url.startswith(self.api_base):
+            return None
+
+        url = url[len(self.api_base):]
+        ttl = self.cache.get_ttl(url)
+        if ttl is None:
+            return None
+
+        key = self.cache.get_key(
+            url, (self.key, self.user.get_highest_priority_token()))
+        return key, url, self.cache.get(key), ttl
+
+    def _invalidate_cache(self, url):
+        if self.cache is not None and url.startswith(self.api_base):
+            self.cache.invalidate(url[len(self.api_base):])
+
     def _expand_url(self, url):
         if not url[:4] == 'http':
             return '{0}{1}'.format(self.api_base, url)
         return url
 
-    def _get_client(self):
+    def _get_token(self):
+        """Return the oauth2 Token of the current user's tokens, or None."""
         token = self.user.get_highest_priority_token()
-        if token:
-            token = oauth.Token(token, self.user.token_secret)
-            client = oauth.Client(self.consumer, token=token)
+        if not token:
+            return None
+
+        token_pair = (token, self.user.token_secret)
+        oauth_token = self._tokens.get(token_pair)
+        if oauth_token is None:
+            oauth_token = _import_oauth().Token(*token_pair)
+            self._tokens[token_pair] = oauth_token
+        return oauth_token
+
+    def _sign(self, method, url, body, headers):
+        """Return the url, body and headers of the signed request.
+
+        The OAuth parameters go where oauth2.Client puts them: in the
+        body of form encoded requests, in the url of other GET requests,
+        and in the Authorization header otherwise.
+
+        """
+        consumer = self.consumer  # imports oauth2 on the first request
+        token = self._get_token()
+        is_form_encoded = headers.get('Content-Type') == FORM_ENCODED
+        parameters = None
+        if is_form_encoded and body:
+            parameters = parse_qs(body)
+
+        request = oauth.Request.from_consumer_and_token(
+            consumer, token=token, http_method=method, http_url=url,
+            parameters=parameters, body=body,
+            is_form_encoded=is_form_encoded)
+        request.sign_request(self.signature_method, consumer, token)
+
+        if is_form_encoded:
+            body = request.to_postdata()
+        elif method == 'GET':
+            url = request.to_url()
         else:
-            client = oauth.Client(self.consumer)
+            scheme, netloc = urlsplit(url)[:2]
+            realm = urlunsplit((scheme, netloc, '', '', ''))
+            headers.update(request.to_header(realm=realm))
+        return url, body, headers
 
-        return client
+    @property
+    def consumer(self):
+        if self._consumer is None:
+            self._consumer = _import_oauth().Consumer(
+                key=self.key, secret=self.secret)
+        return self._consumer
+
+    @property
+    def signature_method(self):
+        if self._signature_method is None:
+            from aweber_api.signature import PreparedHMACSHA1
+            self._signature_method = PreparedHMACSHA1()
+        return self._signature_method
 
     def _prepare_request_body(self, method, url, data):
         if method not in ['POST', 'GET', 'PATCH'] or len(data.keys()) == 0:
@@ -95,3 +436,68 @@ class OAuthAdapter(object):
             return urlencode(data)
         if method == 'PATCH':
             return json.dumps(data)
+
+
+def _call_or_error(func, *args):
+    try:
+        return func(*args)
+    except (APIException, EnvironmentError) as error:
+        return error
+
+
+def _import_oauth():
+    """Import oauth2 into the module, and return it.
+
+    Importing aweber_api does not import oauth2, and requests then use
+    the module global rather than an import statement.
+
+    """
+    global oauth
+    if oauth is None:
+        import oauth2
+        oauth = oauth2
+    return oauth
+
+
+def _get_error(resp, content):
+    """Return the APIException of an error response.
+
+    The subclass depends on the HTTP status and on the type of the
+    error.  Bodies that are not JSON errors, ie: the HTML page of a
+    proxy, are put in the message as they are.
+
+    """
+    status = int(resp['status'])
+    try:
+        error = json.loads(content)['error']
+        error_type = error.get('type')
+        message = '{0}: {1}'.format(error_type, error.get('message'))
+    except (ValueError, TypeError, KeyError, AttributeError):
+        error_type = None
+        message = '{0}: {1}'.format(status, (content or '').strip()[:200])
+
+    if status == 429 or error_type == 'RateLimitError':
+        cls = RateLimited
+    elif status == 404:
+        cls = NotFound
+    elif status in (401, 403):
+        cls = Unauthorized
+    elif status >= 500:
+        cls = ServerError
+    else:
+        cls = APIException
+    return cls(message, status=status, error_type=error_type, headers=resp,
+               retry_after=_get_retry_after(resp.get('retry-after')))
+
+
+def _get_retry_after(value):
+    """Return the seconds to wait of a Retry-After header, or None."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        date = parsedate_tz(value)
+        if date is None:
+            return None
+        return max(mktime_tz(date) - time.time(), 0)
@@ -0,0 +1,157 @@
+import sys
+
+from aweber_api.lru import OrderedDict
+
+
+def _approximate_size(value):
+    """Estimate the memory held by decoded JSON data, in bytes."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.iteritems():
+            size += sys.getsizeof(key) + _approximate_size(item)
+    elif isinstance(value, list):
+        for item in value:
+            size += _approximate_size(item)
+    return size
+
+
+class _Page(object):
+
+    def __init__(self, start, data, size):
+        self.start = start
+        self.data = data
+        self.entries = {}
+        self.size = size
+
+
+class PageCache(object):
+    """Bounded LRU cache of the pages of an AWeberCollection.
+
+    Holds the entry data of each page loaded, along with the entries
+    created from it, keyed by offset.  Once there are more than
+    max_pages pages, or the pages hold more than max_bytes (estimated
+    from the decoded data), the least recently used pages are evicted
+    with their entries.  Either bound may be None for no limit.  Pages
+    are only sized while max_bytes is set; set_limits sizes the pages
+    already cached when it sets it.
+
+    Entry lookups are counted in hits, when the page of the offset is
+    cached, and misses; evicted pages are counted in evictions.
+
+    """
+
+    def __init__(self, max_pages=None, max_bytes=None):
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        # Pages from the least to the most recently used.
+        self._pages = OrderedDict()
+        self._offsets = {}
+
+    def __len__(self):
+        return len(self._pages)
+
+    def set_limits(self, max_pages=None, max_bytes=None):
+        """Change the bounds, evicting the pages now over them."""
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        if max_bytes is not None:
+            for page in self._pages.itervalues():
+                if not page.size:
+                    page.size = _approximate_size(page.data)
+                    self.bytes += page.size
+        self._evict(keep=None)
+
+    def __contains__(self, offset):
+        return offset in self._offsets
+
+    def add_page(self, start, data):
+        """Cache the list of entry data of the page found at start."""
+        if not data:
+            return
+        if start in self._pages:
+            self._remove(self._pages[start])
+
+        size = 0
+        if self.max_bytes is not None:
+            size = _approximate_size(data)
+        page = _Page(start, data, size)
+        self._pages[start] = page
+        for offset in xrange(start, start + len(data)):
+            self._offsets[offset] = page
+        self.bytes += size
+        self._touch(page)
+        self._evict(keep=page)
+
+    def get(self, offset):
+        """Return the entry data at offset, or None when not cached."""
+        page = self._offsets.get(offset)
+        if page is None:
+            return None
+        self._touch(page)
+        return page.data[offset - page.start]
+
+    def get_page_data(self, offset):
+        """Return the entry data from offset to the end of its page.
+
+        Returns None when offset is not cached.
+
+        """
+        page = self._offsets.get(offset)
+        if page is None:
+            return None
+        self._touch(page)
+        return page.data[offset - page.start:]
+
+    def get_entry(self, offset):
+        """Return the entry created for offset, or None."""
+        page = self._offsets.get(offset)
+        if page is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touch(page)
+        return page.entries.get(offset)
+
+    def set_entry(self, offset, entry):
+        page = self._offsets.get(offset)
+        if page is not None:
+            page.entries[offset] = entry
+
+    def stats(self):
+        """Return a dict of the cache counters."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'pages': len(self._pages),
+            'bytes': self.bytes,
+        }
+
+    def _touch(self, page):
+        del self._pages[page.start]
+        self._pages[page.start] = page
+
+    def _evict(self, keep):
+        while len(self._pages) > 1 and self._over_limit():
+            page = next(self._pages.itervalues())
+            if page is keep:
+                self._touch(page)
+                continue
+            self._remove(page)
+            self.evictions += 1
+
+    def _over_limit(self):
+        if self.max_pages is not None and len(self._pages) > self.max_pages:
+            return True
+        return self.max_bytes is not None and self.bytes > self.max_bytes
+
+    def _remove(self, page):
+        del self._pages[page.start]
+        for offset in xrange(page.start, page.start + len(page.data)):
+            if self._offsets.get(offset) is page:
+                del self._offsets[offset]
+        self.bytes -= page.size
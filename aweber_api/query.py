@@ -0,0 +1,71 @@
+from urllib import urlencode
+
+
+class Query(object):
+    """A find request on a collection that is only sent when needed.
+
+    Built with AWeberCollection.query, ie:
+        collection.query().where(status='subscribed').fields('email')
+
+    where, fields and page_size return a new Query, so a query can be
+    extended without changing the original.  Iterating a query requests
+    its pages one at a time by following the next_collection_link, and
+    never requests the total size; count only requests the total size.
+
+    """
+
+    def __init__(self, collection, filters=None, fields=None, page_size=None):
+        self.collection = collection
+        self.adapter = collection.adapter
+        self._filters = dict(filters or {})
+        self._fields = fields
+        self._page_size = page_size
+
+    def where(self, **filters):
+        """Return a new Query also matching the given filters."""
+        merged = dict(self._filters)
+        merged.update(filters)
+        return self._copy(filters=merged)
+
+    def fields(self, *names):
+        """Return a new Query yielding dicts of only the named fields.
+
+        The API always returns whole entries; the fields are picked
+        from the response, and no entries are created for them.
+
+        """
+        return self._copy(fields=names)
+
+    def page_size(self, page_size):
+        """Return a new Query requesting page_size entries per page."""
+        return self._copy(page_size=page_size)
+
+    def _copy(self, **kwargs):
+        options = {
+            'filters': self._filters,
+            'fields': self._fields,
+            'page_size': self._page_size,
+        }
+        options.update(kwargs)
+        return Query(self.collection, **options)
+
+    @property
+    def url(self):
+        params = {'ws.op': 'find'}
+        params.update(self._filters)
+        return '{0}?{1}'.format(self.collection.url, urlencode(params))
+
+    def count(self):
+        """Return the number of matching entries."""
+        return self.collection._get_total_size(self.url)
+
+    def __iter__(self):
+        params = self.collection._page_params(self._page_size)
+        for data in self.collection._load_pages(self.url, params):
+            for item in data['entries']:
+                yield self._get_result(item)
+
+    def _get_result(self, item):
+        if self._fields is None:
+            return self.collection._entry_from_data(item)
+        return dict((name, item.get(name)) for name in self._fields)
@@ -1,19 +1,30 @@
-from aweber_api import AWeberBase
+from aweber_api.base import AWeberBase
+
+_resource_types = {}
+
+
+def resource_type(data):
+    """Return the resource type named by the resource_type_link in data."""
+    link = data.get('resource_type_link')
+    if link is None:
+        return None
+    if not link in _resource_types:
+        _resource_types[link] = link.split('#').pop()
+    return _resource_types[link]
 
 
 class AWeberResponse(AWeberBase):
 
     def __init__(self, url, data, adapter):
         self._type = None
+        self._parent = None
         self.adapter = adapter
         self.url = url
         self._data = data
         self._entries = {}
 
     def _generate_type(self):
-        if 'resource_type_link' in self._data:
-            type = self._data['resource_type_link']
-            self._type = type.split('#').pop()
+        self._type = resource_type(self._data)
         return None
 
     @property
@@ -0,0 +1,32 @@
+import weakref
+
+from aweber_api.base import API_BASE
+
+
+class Session(object):
+    """Identity map of the entries loaded through an adapter.
+
+    Entries are keyed by their self_link, relative to the API base, as
+    well as by the url they were loaded from, and are only held weakly:
+    the session never keeps an entry alive on its own.  Looking up the
+    same resource through any path (offsets in a collection, get_by_id,
+    named operations, parent lookups) yields the same AWeberEntry
+    instance while it is in use.
+
+    """
+
+    def __init__(self):
+        self.entries = weakref.WeakValueDictionary()
+
+    def _key(self, url):
+        return url.replace(API_BASE, '')
+
+    def get(self, url):
+        """Return the loaded entry for url, or None."""
+        return self.entries.get(self._key(url))
+
+    def add(self, entry):
+        """Add an entry, keyed by its self_link and the url it came from."""
+        self.entries[self._key(entry.url)] = entry
+        if 'self_link' in entry._data:
+            self.entries[self._key(entry._data['self_link'])] = entry
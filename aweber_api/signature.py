@@ -0,0 +1,80 @@
+from hashlib import sha1
+from urllib import urlencode
+import binascii
+import hmac
+
+import oauth2 as oauth
+
+from aweber_api.lru import LRUCache
+
+
+def _utf8(value):
+    if isinstance(value, unicode):
+        return value.encode('utf-8')
+    if isinstance(value, str):
+        return value
+    return str(value)
+
+
+class PreparedHMACSHA1(oauth.SignatureMethod_HMAC_SHA1):
+    """HMAC-SHA1 signature method that reuses keyed hmac state.
+
+    The signing key only depends on the consumer and token secrets, so
+    the keyed hmac is prepared once per pair of secrets and copied for
+    every request instead of being rebuilt from scratch.  Up to
+    max_prepared pairs are kept, the least recently used are dropped.
+    Parameters are normalized the same way oauth2 does, without its
+    per-item validation overhead.
+
+    """
+
+    max_prepared = 64
+
+    def __init__(self):
+        self._prepared = LRUCache(self.max_prepared)
+
+    def _prepare(self, consumer, token):
+        secrets = (consumer.secret, token and token.secret)
+        prepared = self._prepared.get(secrets)
+        if prepared is None:
+            key = '{0}&'.format(oauth.escape(consumer.secret))
+            if token:
+                key += oauth.escape(token.secret)
+            prepared = hmac.new(key.encode('ascii'), digestmod=sha1)
+            self._prepared[secrets] = prepared
+        return prepared
+
+    def _normalized_parameters(self, request):
+        items = []
+        self._add_items(items, request.iteritems())
+
+        query = request.url.partition('?')[2]
+        if query:
+            self._add_items(
+                items, request._split_url_string(query).iteritems())
+
+        items.sort()
+        encoded = urlencode(items)
+        return encoded.replace('+', '%20').replace('%7E', '~')
+
+    def _add_items(self, items, parameters):
+        for key, value in parameters:
+            if key == 'oauth_signature':
+                continue
+            if isinstance(value, (list, tuple)):
+                items.extend((_utf8(key), _utf8(item)) for item in value)
+            else:
+                items.append((_utf8(key), _utf8(value)))
+
+    def sign(self, request, consumer, token):
+        if getattr(request, 'normalized_url', None) is None:
+            raise ValueError("Base URL for request is not set.")
+
+        raw = '&'.join((
+            oauth.escape(request.method),
+            oauth.escape(request.normalized_url),
+            oauth.escape(self._normalized_parameters(request)),
+        ))
+        hashed = self._prepare(consumer, token).copy()
+        hashed.update(raw.encode('ascii'))
+        return binascii.b2a_base64(hashed.digest())[:-1]
@@ -0,0 +1,116 @@
+from collections import namedtuple
+import heapq
+import os
+import tempfile
+
+from aweber_api.concurrency import imap_concurrently
+
+
+class Change(namedtuple('Change', ['kind', 'id', 'http_etag'])):
+    """A subscriber 'added', 'removed' or 'changed' between snapshots.
+
+    http_etag is the subscriber's etag in the newer snapshot, or in the
+    older one for removed subscribers.
+
+    """
+    __slots__ = ()
+
+
+def take_snapshot(list_, path, page_size=100, chunk_size=100000):
+    """Write the id and http_etag of each subscriber of list_ to path.
+
+    The subscriber pages are read as raw data, without creating any
+    entries, and the fingerprints are written sorted by id, one per
+    line.  Subscribers seen twice, as pages shift when subscribers are
+    added or removed during the crawl, are written once.  At most
+    chunk_size fingerprints are held in memory; larger lists are sorted
+    in chunks that are merged into path.  Returns the number of
+    subscribers.
+
+    """
+    url = '{0}/subscribers'.format(list_.url)
+    chunk, chunks, count = [], [], 0
+    tmp_path = path + '.tmp'
+    try:
+        for data in list_._load_pages(url, list_._page_params(page_size)):
+            for item in data['entries']:
+                chunk.append((int(item['id']), item.get('http_etag') or ''))
+            if len(chunk) >= chunk_size:
+                chunks.append(_write_chunk(chunk, os.path.dirname(path)))
+                chunk = []
+
+        chunk.sort()
+        files = [_read(chunk_path) for chunk_path in chunks]
+        last_id = None
+        with open(tmp_path, 'w') as snapshot:
+            for id, etag in heapq.merge(iter(chunk), *files):
+                if id == last_id:
+                    continue
+                snapshot.write('{0}\t{1}\n'.format(id, etag))
+                last_id = id
+                count += 1
+        os.rename(tmp_path, path)
+    finally:
+        for chunk_path in chunks:
+            os.remove(chunk_path)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return count
+
+
+def _write_chunk(chunk, directory):
+    chunk.sort()
+    handle, chunk_path = tempfile.mkstemp(
+        suffix='.snapshot', dir=directory or None)
+    with os.fdopen(handle, 'w') as chunk_file:
+        for id, etag in chunk:
+            chunk_file.write('{0}\t{1}\n'.format(id, etag))
+    return chunk_path
+
+
+def _read(path):
+    with open(path) as snapshot:
+        for line in snapshot:
+            id, etag = line.rstrip('\n').split('\t', 1)
+            yield int(id), etag
+
+
+def diff_snapshots(old_path, new_path):
+    """Yield a Change for each subscriber that differs between snapshots.
+
+    Both snapshots are read once, side by side, so memory use does not
+    depend on their size.  Changes are yielded in order of id.
+
+    """
+    old, new = _read(old_path), _read(new_path)
+    old_item, new_item = next(old, None), next(new, None)
+    while old_item is not None or new_item is not None:
+        if new_item is None or (
+                old_item is not None and old_item[0] < new_item[0]):
+            yield Change('removed', *old_item)
+            old_item = next(old, None)
+        elif old_item is None or new_item[0] < old_item[0]:
+            yield Change('added', *new_item)
+            new_item = next(new, None)
+        else:
+            if old_item[1] != new_item[1]:
+                yield Change('changed', *new_item)
+            old_item, new_item = next(old, None), next(new, None)
+
+
+def load_changed(list_, changes, concurrency=4):
+    """Yield (change, subscriber entry) for added and changed subscribers.
+
+    Only these subscribers are requested, up to concurrency at a time;
+    removed subscribers are skipped.
+
+    """
+    changes = [change for change in changes if change.kind != 'removed']
+
+    def load(change):
+        url = '{0}/subscribers/{1}'.format(list_.url, change.id)
+        return change, list_.load_from_url(url)
+
+    for change, entry in imap_concurrently(
+            load, changes, concurrency, list_.adapter):
+        yield change, entry
@@ -0,0 +1,173 @@
+from hashlib import sha1
+import math
+import threading
+
+from aweber_api.base import API_BASE
+from aweber_api.collection import AWeberCollection
+from aweber_api.concurrency import map_concurrently
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class HyperLogLog(object):
+    """Approximate count of distinct values in constant memory.
+
+    Uses 2 ** precision one byte registers; the standard error of the
+    count is about 1.04 / sqrt(2 ** precision), 1.6% by default.
+
+    """
+
+    def __init__(self, precision=12):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value):
+        if isinstance(value, unicode):
+            value = value.encode('utf-8')
+        hashed = int(sha1(value).hexdigest()[:16], 16)
+        index = hashed >> (64 - self.precision)
+        rest = hashed & ((1 << (64 - self.precision)) - 1)
+        # Position of the leftmost 1 bit in the remaining bits, one past
+        # the end of them when they are all zero.
+        if rest:
+            rank = 64 - self.precision - (len(bin(rest)) - 2) + 1
+        else:
+            rank = 64 - self.precision + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        """Add the values counted by other, of the same precision."""
+        for index, rank in enumerate(other.registers):
+            if rank > self.registers[index]:
+                self.registers[index] = rank
+
+    def __len__(self):
+        size = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / sum(
+            2.0 ** -rank for rank in self.registers)
+
+        zeros = self.registers.count('\0')
+        if estimate <= 2.5 * size and zeros:
+            estimate = size * math.log(float(size) / zeros)
+        return int(round(estimate))
+
+
+class StatsAggregator(object):
+    """Counts opens, clicks or tracked events from raw collection pages.
+
+    Each page is summarized as it is added, so nothing is kept of the
+    events themselves:
+        total: the number of events
+        by_parent: the events by the url of the resource they belong
+            to, ie: the link of clicks, the message of opens
+        by_hour: the events by hour of their event_time, ie:
+            '2014-09-06T18', in the time zone the API returns
+        unique_subscribers: the approximate number of subscribers
+
+    The hours are counted with NumPy when it is installed.
+
+    """
+
+    def __init__(self, precision=12, use_numpy=None):
+        self.total = 0
+        self.by_parent = {}
+        self.by_hour = {}
+        self.subscribers = HyperLogLog(precision)
+        if use_numpy is None:
+            use_numpy = numpy is not None
+        self.use_numpy = use_numpy
+
+    @property
+    def unique_subscribers(self):
+        return len(self.subscribers)
+
+    def add_page(self, url, entries):
+        """Add the entries of a page of the collection at url."""
+        if not entries:
+            return
+
+        parent = url.replace(API_BASE, '').split('?')[0].rsplit('/', 1)[0]
+        self.total += len(entries)
+        self.by_parent[parent] = self.by_parent.get(parent, 0) + len(entries)
+
+        hours = []
+        for entry in entries:
+            hours.append((entry.get('event_time') or '')[:13])
+            subscriber = entry.get('subscriber_link')
+            if subscriber:
+                self.subscribers.add(subscriber)
+        self._count_hours(hours)
+
+    def _count_hours(self, hours):
+        if self.use_numpy:
+            values, counts = numpy.unique(
+                numpy.array(hours), return_counts=True)
+            hours = zip(values.tolist(), counts.tolist())
+        else:
+            counted = {}
+            for hour in hours:
+                counted[hour] = counted.get(hour, 0) + 1
+            hours = counted.iteritems()
+
+        for hour, count in hours:
+            self.by_hour[hour] = self.by_hour.get(hour, 0) + count
+
+
+def aggregate(adapter, urls, concurrency=4, page_size=100, aggregator=None):
+    """Return a StatsAggregator of the events of the collections at urls.
+
+    urls are event collections, ie: the opens of a message or the
+    clicks of a link.  The first page of each collection tells its total
+    size, and the remaining pages are then requested at the same time,
+    up to concurrency at once.  Collections without a total size are
+    read by following their next_collection_link.  Pages are added to
+    the aggregator as soon as they arrive, and are not kept.
+
+    page_size is capped at the size the API returns; when the first page
+    is shorter than requested, the remaining pages are of its size.
+
+    """
+    if aggregator is None:
+        aggregator = StatsAggregator()
+    page_size = min(page_size, AWeberCollection.max_page_size)
+    lock = threading.Lock()
+
+    def add(url, data):
+        with lock:
+            aggregator.add_page(url, data['entries'])
+
+    def load_page(page):
+        url, start, size = page
+        add(url, adapter.request(
+            'GET', url, {'ws.start': start, 'ws.size': size}))
+
+    def load_first_page(url):
+        data = adapter.request(
+            'GET', url, {'ws.start': 0, 'ws.size': page_size})
+        add(url, data)
+
+        total_size = data.get('total_size')
+        if total_size is not None:
+            size = len(data['entries'])
+            if not size or size >= total_size:
+                return []
+            return [(url, start, size)
+                    for start in xrange(size, total_size, size)]
+
+        while data.get('next_collection_link'):
+            data = adapter.request(
+                'GET', data['next_collection_link'].replace(API_BASE, ''))
+            add(url, data)
+        return []
+
+    pages = []
+    for remaining in map_concurrently(
+            load_first_page, urls, concurrency, adapter):
+        pages.extend(remaining)
+    map_concurrently(load_page, pages, concurrency, adapter)
+    return aggregator
@@ -0,0 +1,237 @@
+from urllib import urlencode
+from urlparse import parse_qsl, urlsplit, urlunsplit
+import json
+import socket
+import threading
+
+from aweber_api.concurrency import _thread_pool
+
+FORM_ENCODED = 'application/x-www-form-urlencoded'
+
+
+class Httplib2Transport(object):
+    """Sends requests with httplib2, the default transport.
+
+    Each thread uses its own httplib2.Http, keeping its connections
+    open between requests.  Keyword arguments, ie: timeout, are passed
+    to httplib2.Http.  httplib2 decodes compressed responses itself, so
+    the size of each body as read from the socket is returned in the
+    -content-length header, for the adapter to count.
+
+    The timeout of a request, in seconds, bounds the connection and
+    each read from the socket.  It is also applied to the connections
+    already open.
+
+    """
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self._local = threading.local()
+        self._connection_types = {}
+
+    def _get_http(self):
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            import httplib2
+            http = self._local.http = httplib2.Http(**self.kwargs)
+        return http
+
+    def request(self, url, method='GET', body=None, headers=None,
+                timeout=None):
+        """Return the response headers, with the status, and content."""
+        http = self._get_http()
+        if timeout is None:
+            timeout = self.kwargs.get('timeout')
+        if timeout != http.timeout:
+            self._set_timeout(http, timeout)
+        self._local.received = None
+        resp, content = http.request(
+            url, method, body=body, headers=headers,
+            connection_type=self._get_connection_type(url))
+        if self._local.received is not None:
+            resp['-content-length'] = str(self._local.received)
+        return resp, content
+
+    def _get_connection_type(self, url):
+        """Return the connection class of httplib2 for the scheme of url,
+        counting the body bytes of the responses it reads."""
+        scheme = urlsplit(url)[0]
+        if not scheme in self._connection_types:
+            import httplib2
+            connection_type = httplib2.SCHEME_TO_CONNECTION.get(scheme)
+            if connection_type is not None:
+                connection_type = _counting_connection(
+                    connection_type, self._local)
+            self._connection_types[scheme] = connection_type
+        return self._connection_types[scheme]
+
+    def _set_timeout(self, http, timeout):
+        http.timeout = timeout
+        for connection in http.connections.values():
+            connection.timeout = timeout
+            if connection.sock is not None:
+                connection.sock.settimeout(timeout)
+
+
+def _counting_connection(base, local):
+    """Return a subclass of the connection class base, adding the number
+    of body bytes its responses read to local.received."""
+    response_class = base.response_class
+
+    class CountingResponse(response_class):
+
+        def read(self, amt=None):
+            data = response_class.read(self, amt)
+            local.received = (local.received or 0) + len(data)
+            return data
+
+    class CountingConnection(base):
+        pass
+
+    CountingConnection.response_class = CountingResponse
+    return CountingConnection
+
+
+class Urllib3Transport(object):
+    """Sends requests with a urllib3 connection pool.
+
+    Keeps up to maxsize connections per host open, shared by all the
+    threads.  Other keyword arguments are passed to urllib3.PoolManager,
+    ie: a urllib3.Timeout with separate connect and read timeouts.
+    Needs the urllib3 package.  Compressed responses are left for the
+    adapter to decode.  Timeouts are raised as socket.timeout, like the
+    other transports.  Requests are not retried unless retries is given,
+    so a request that timed out is not sent again past its deadline.
+
+    """
+
+    def __init__(self, num_pools=10, maxsize=10, **kwargs):
+        import urllib3
+        kwargs.setdefault('retries', False)
+        self.pool = urllib3.PoolManager(
+            num_pools=num_pools, maxsize=maxsize, **kwargs)
+
+    def request(self, url, method='GET', body=None, headers=None,
+                timeout=None):
+        """Return the response headers, with the status, and content."""
+        from urllib3.exceptions import MaxRetryError, TimeoutError
+        kwargs = {}
+        if timeout is not None:
+            kwargs['timeout'] = timeout
+        try:
+            response = self.pool.urlopen(
+                method, url, body=body or None, headers=headers,
+                decode_content=False, **kwargs)
+        except TimeoutError as error:
+            raise socket.timeout(str(error))
+        except MaxRetryError as error:
+            if isinstance(error.reason, TimeoutError):
+                raise socket.timeout(str(error.reason))
+            raise
+        resp = dict((key.lower(), value)
+                    for key, value in response.headers.items())
+        resp['status'] = str(response.status)
+        return resp, response.data
+
+
+class ThreadedTransport(object):
+    """Sends the requests of another transport from a pool of threads.
+
+    submit returns an AsyncResult right away, so any number of requests
+    can be in flight; request waits for the response.  The requests of
+    OAuthAdapter.request_many are submitted, once signed by the adapter.
+    By default the requests are sent with an Httplib2Transport, which
+    gives each of the workers its own connections.
+
+    """
+
+    def __init__(self, transport=None, workers=4):
+        self.transport = transport or Httplib2Transport()
+        self.workers = workers
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def submit(self, url, method='GET', body=None, headers=None,
+               timeout=None):
+        with self._lock:
+            if self._pool is None:
+                self._pool = _thread_pool(self.workers)
+        kwargs = {}
+        if timeout is not None:
+            kwargs['timeout'] = timeout
+        return self._pool.apply_async(
+            self.transport.request, (url, method, body, headers), kwargs)
+
+    def request(self, url, method='GET', body=None, headers=None,
+                timeout=None):
+        """Return the response headers, with the status, and content."""
+        return self.submit(url, method, body, headers, timeout).get()
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool.join()
+                self._pool = None
+
+
+class StubTransport(object):
+    """Answers requests in-process, for tests and benchmarks.
+
+    The OAuth parameters are removed from the url and body before the
+    request is answered, so responses are matched on the request as
+    the adapter built it.  Responses are either added with add, or
+    returned by handler(method, url, body, headers).  Unknown requests
+    get a 404.  All requests are kept in requests, with their timeout.
+
+    """
+
+    def __init__(self, handler=None):
+        self.handler = handler
+        self.responses = {}
+        self.requests = []
+
+    def add(self, method, url, content='', status=200, headers=None):
+        """Answer method requests for url with content."""
+        if not isinstance(content, basestring):
+            content = json.dumps(content)
+        resp = dict(headers or {})
+        resp['status'] = str(status)
+        self.responses[(method, normalize_url(url))] = (resp, content)
+
+    def request(self, url, method='GET', body=None, headers=None,
+                timeout=None):
+        """Return the response headers, with the status, and content."""
+        url = strip_oauth_params(url)
+        if body and (headers or {}).get('Content-Type') == FORM_ENCODED:
+            body = urlencode(_without_oauth(parse_qsl(body, True)))
+        self.requests.append({'method': method, 'url': url, 'body': body,
+                              'headers': headers, 'timeout': timeout})
+
+        if self.handler is not None:
+            return self.handler(method, url, body, headers)
+
+        response = self.responses.get((method, normalize_url(url)))
+        if response is None:
+            return {'status': '404'}, json.dumps({'error': {
+                'type': 'NotFoundError', 'message': 'Not Found'}})
+        return dict(response[0]), response[1]
+
+
+def _without_oauth(params):
+    return [(key, value) for key, value in params
+            if not key.startswith('oauth_')]
+
+
+def strip_oauth_params(url):
+    """Return url without the OAuth parameters added when signing."""
+    scheme, netloc, path, query, fragment = urlsplit(url)
+    query = urlencode(_without_oauth(parse_qsl(query, True)))
+    return urlunsplit((scheme, netloc, path, query, fragment))
+
+
+def normalize_url(url):
+    """Return url with its query parameters sorted."""
+    scheme, netloc, path, query, fragment = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(query, True)))
+    return urlunsplit((scheme, netloc, path, query, fragment))
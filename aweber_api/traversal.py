@@ -0,0 +1,105 @@
+from collections import deque
+from Queue import Queue
+import sys
+
+from aweber_api.base import API_BASE
+from aweber_api.concurrency import _thread_pool, with_deadline
+
+
+def traverse(entry, include=None, exclude=None, max_depth=None,
+             concurrency=4, page_size=None):
+    """Yield the entries below entry, breadth-first.
+
+    The child collections of each entry are taken from collections_map,
+    ie: an account's lists, then the lists' campaigns, subscribers, ...
+    Up to concurrency pages are loaded at the same time, and the entries
+    of each page are yielded as soon as it arrives.  Only the entries
+    with child collections to load are kept for the next level, so
+    subscribers and other leaves are never held on to.
+
+    include and exclude are collections of child collection names, ie:
+    ['lists', 'campaigns'], limiting the collections that are loaded.
+    max_depth is the number of levels below entry to load, and
+    page_size the number of entries requested per page.
+
+    """
+    level = [entry]
+    depth = 0
+    while level and (max_depth is None or depth < max_depth):
+        depth += 1
+        pages = deque(
+            (parent, '{0}/{1}'.format(parent.url, name),
+             parent._page_params(page_size))
+            for parent in level
+            for name in _child_collections(parent, include, exclude))
+        level = []
+
+        for parent, data in _iter_pages(pages, concurrency, entry.adapter):
+            for item in data['entries']:
+                child = parent._get_entry(
+                    item['self_link'].replace(API_BASE, ''), item)
+                child._set_parent(parent)
+                if (max_depth is None or depth < max_depth) and (
+                        _child_collections(child, include, exclude)):
+                    level.append(child)
+                yield child
+
+
+def _iter_pages(pages, concurrency, adapter=None):
+    """Yield (parent, data) for each page of the collections in pages.
+
+    pages is a deque of (parent, url, params), to which the next page
+    of a collection is added once its previous page arrives.  Up to
+    concurrency pages are requested at the same time, and pages are
+    yielded as they arrive, within the deadline the calling thread has
+    on adapter.
+
+    """
+    def load(page):
+        parent, url, params = page
+        try:
+            return parent, parent.adapter.request('GET', url, params), None
+        except Exception:
+            return parent, None, sys.exc_info()
+
+    pool = None
+    if concurrency is not None and concurrency > 1 and len(pages) > 1:
+        pool = _thread_pool(concurrency)
+        load = with_deadline(load, adapter)
+    results = Queue()
+    running = 0
+    try:
+        while pages or running:
+            while pages and (running == 0 or (
+                    pool is not None and running < concurrency)):
+                if pool is None:
+                    results.put(load(pages.popleft()))
+                else:
+                    pool.apply_async(
+                        load, (pages.popleft(),), callback=results.put)
+                running += 1
+
+            parent, data, error = results.get()
+            running -= 1
+            if error is not None:
+                raise error[0], error[1], error[2]
+            if not 'entries' in data:
+                continue
+
+            next_link = data.get('next_collection_link')
+            if next_link:
+                pages.append((parent, next_link.replace(API_BASE, ''), {}))
+            yield parent, data
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+
+def _child_collections(entry, include, exclude):
+    names = entry.collections_map.get(entry.type, [])
+    if isinstance(names, basestring):
+        names = [names]
+    return [name for name in names
+            if (include is None or name in include) and
+            (exclude is None or not name in exclude)]
@@ -0,0 +1,235 @@
+import json
+import logging
+import threading
+import time
+import weakref
+
+from aweber_api.base import APIException
+from aweber_api.concurrency import map_concurrently
+
+log = logging.getLogger(__name__)
+
+
+class WriteQueue(object):
+    """Durable queue of writes to the API, sent in the background.
+
+    create, save, move and delete record the write in a sqlite database
+    at path and return right away; the writes are sent by flush, or by
+    the background thread started with start.  A write is only removed
+    from the database once the API accepted it, so writes survive a
+    crash; a write may however be sent again if the process stopped
+    right after sending it.  Several queues, in one process or more, may
+    share the database: each write is claimed by one of them before it
+    is sent, and a claim older than claim_timeout seconds is taken to be
+    of a queue that stopped while sending.
+
+    Writes to the same url are sent one at a time, in the order they
+    were queued, while writes to different urls are sent up to workers
+    at a time.  Writes failing with a retryable APIException, ie: a
+    rate limit or a server error, or with a connection error are retried
+    after backoff seconds, doubled on every attempt, or after the delay
+    asked by the API, up to max_retries times.  Writes that can not
+    succeed are kept as failed, see failed.
+
+    """
+
+    def __init__(self, adapter, path, workers=4, batch_size=50,
+                 max_retries=5, backoff=1.0, claim_timeout=300):
+        self.adapter = adapter
+        self.path = path
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.claim_timeout = claim_timeout
+        self._local = threading.local()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._saved = weakref.WeakValueDictionary()
+        self._saved_lock = threading.Lock()
+
+        connection = self._connect()
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS writes ('
+            'id INTEGER PRIMARY KEY AUTOINCREMENT, method TEXT, url TEXT, '
+            'data TEXT, attempts INTEGER DEFAULT 0, failed INTEGER DEFAULT 0, '
+            'error TEXT, available_at REAL DEFAULT 0, claimed_at REAL)')
+        connection.commit()
+
+    def _connect(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            import sqlite3
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute('PRAGMA synchronous=FULL')
+            self._local.connection = connection
+        return connection
+
+    def enqueue(self, method, url, data=None):
+        """Record a request to send, and return its id."""
+        connection = self._connect()
+        cursor = connection.execute(
+            'INSERT INTO writes (method, url, data) VALUES (?, ?, ?)',
+            (method, url, json.dumps(data or {})))
+        connection.commit()
+        self._wake.set()
+        return cursor.lastrowid
+
+    def create(self, collection, **kwargs):
+        """Queue AWeberCollection.create."""
+        params = {'ws.op': 'create'}
+        params.update(kwargs)
+        return self.enqueue('POST', collection.url, params)
+
+    def save(self, entry):
+        """Queue AWeberEntry.save.
+
+        The changes of entry are reset once the write is sent, unless
+        entry was changed again in the meantime.
+
+        """
+        write = self.enqueue('PATCH', entry.url, entry._get_diff())
+        with self._saved_lock:
+            self._saved[write] = entry
+        return write
+
+    def move(self, entry, list_, **kwargs):
+        """Queue AWeberEntry.move, without reloading entry."""
+        params = {'ws.op': 'move', 'list_link': list_.self_link}
+        params.update(kwargs)
+        return self.enqueue('POST', entry.url, params)
+
+    def delete(self, entry):
+        """Queue AWeberEntry.delete."""
+        return self.enqueue('DELETE', entry.url)
+
+    def __len__(self):
+        """Return the number of writes still to send."""
+        return self._connect().execute(
+            'SELECT COUNT(*) FROM writes WHERE failed = 0').fetchone()[0]
+
+    def failed(self):
+        """Return the (id, method, url, data, error) of failed writes."""
+        return [(id, method, url, json.loads(data), error)
+                for id, method, url, data, error in self._connect().execute(
+                    'SELECT id, method, url, data, error FROM writes '
+                    'WHERE failed = 1 ORDER BY id')]
+
+    def flush(self):
+        """Send the writes that are due, and return how many were sent."""
+        sent = 0
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return sent
+            results = map_concurrently(
+                self._send, batch, self.workers, self.adapter)
+            sent += sum(1 for result in results if result)
+
+    def _next_batch(self):
+        # Only the oldest write of each url may be sent, once no other
+        # queue is sending it.
+        now = time.time()
+        return self._connect().execute(
+            'SELECT id, method, url, data, attempts FROM writes '
+            'WHERE id IN (SELECT MIN(id) FROM writes WHERE failed = 0 '
+            'GROUP BY url) AND available_at <= ? AND (claimed_at IS NULL '
+            'OR claimed_at < ?) ORDER BY id LIMIT ?',
+            (now, now - self.claim_timeout, self.batch_size)).fetchall()
+
+    def _claim(self, id):
+        """Mark write id as being sent, return False if it already was."""
+        connection = self._connect()
+        now = time.time()
+        cursor = connection.execute(
+            'UPDATE writes SET claimed_at = ? WHERE id = ? AND failed = 0 '
+            'AND (claimed_at IS NULL OR claimed_at < ?)',
+            (now, id, now - self.claim_timeout))
+        connection.commit()
+        return cursor.rowcount == 1
+
+    def _send(self, write):
+        id, method, url, data, attempts = write
+        if not self._claim(id):
+            return False
+
+        connection = self._connect()
+        data = json.loads(data)
+        try:
+            self.adapter.request(method, url, _encode(data), response='status')
+        except (APIException, EnvironmentError) as error:
+            if not _is_retryable(error) or attempts >= self.max_retries:
+                connection.execute(
+                    'UPDATE writes SET failed = 1, error = ?, '
+                    'claimed_at = NULL WHERE id = ?', (str(error), id))
+            else:
+                connection.execute(
+                    'UPDATE writes SET attempts = ?, available_at = ?, '
+                    'error = ?, claimed_at = NULL WHERE id = ?',
+                    (attempts + 1, time.time() + _get_delay(
+                        error, self.backoff * 2 ** attempts), str(error), id))
+            connection.commit()
+            return False
+
+        connection.execute('DELETE FROM writes WHERE id = ?', (id,))
+        connection.commit()
+        self._reset_saved(id, data)
+        return True
+
+    def _reset_saved(self, id, data):
+        with self._saved_lock:
+            entry = self._saved.pop(id, None)
+        if entry is not None and json.loads(
+                json.dumps(entry._get_diff())) == data:
+            entry._reset_diff()
+
+    def start(self, interval=1.0):
+        """Send the writes from a background thread.
+
+        Writes are sent as soon as they are queued, and retried every
+        interval seconds.
+
+        """
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, flush=True):
+        """Stop the background thread, and send the writes that are due."""
+        if self._thread is not None:
+            self._stopping.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        if flush:
+            self.flush()
+
+    def _run(self, interval):
+        while not self._stopping.is_set():
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                # ie: the database is locked; the writes stay queued.
+                log.exception('Failed to flush the write queue')
+            self._wake.wait(interval)
+
+
+def _encode(data):
+    # json returns unicode strings, which urlencode can not encode.
+    return dict((key.encode('utf-8'), value.encode('utf-8')
+                 if isinstance(value, unicode) else value)
+                for key, value in data.iteritems())
+
+
+def _is_retryable(error):
+    return isinstance(error, EnvironmentError) or error.retryable
+
+
+def _get_delay(error, backoff):
+    return max(backoff, getattr(error, 'retry_after', None) or 0)
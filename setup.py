@@ -6,6 +6,13 @@ if version < '2.2.3':
     DistributionMetadata.classifiers = None
     DistributionMetadata.download_url = None
 
+install_requires = [
+    'httplib2>=0.9.0,<=0.10.0',
+    'oauth2>=1.2',
+]
+if version < '2.7':
+    install_requires.append('ordereddict')
+
 setup(
     name='aweber_api',
     version='1.4.0',
@@ -27,10 +34,7 @@ setup(
         'License :: OSI Approved :: BSD License',
     ],
     packages=find_packages(exclude=['tests']),
-    install_requires=[
-        'httplib2>=0.9.0,<=0.10.0',
-        'oauth2>=1.2',
-    ],
+    install_requires=install_requires,
     tests_require=[
         'mock',
         'coverage',
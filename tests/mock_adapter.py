@@ -3,10 +3,8 @@ import os
 from urlparse import urlparse, parse_qs
 from urllib import quote
 
-import mock
-
-from aweber_api import AWeberUser
-from aweber_api import OAuthAdapter
+from aweber_api import API_BASE, AWeberUser, OAuthAdapter
+from aweber_api.transport import StubTransport
 
 __all__ = ['MockAdapter']
 
@@ -22,6 +20,9 @@ responses = {
         '/accounts/1?ws.op=getWebForms':             ({}, 'accounts/webForms'),
         '/accounts/1?ws.op=getWebFormSplitTests':    ({}, 'accounts/webFormSplitTests'),
         '/accounts/1/lists':                         ({}, 'lists/page1'),
+        '/accounts/1/lists?ws.size=20':              ({}, 'lists/page1'),
+        '/accounts/1/lists?ws.start=0&ws.size=20':   ({}, 'lists/page1'),
+        '/accounts/1/lists?ws.start=20&ws.size=10':  ({}, 'lists/page2'),
         '/accounts/1/lists?ws.start=20&ws.size=20':  ({}, 'lists/page2'),
         '/accounts/1/lists/303449':                  ({}, 'lists/303449'),
         '/accounts/1/lists/505454':                  ({}, 'lists/505454'),
@@ -33,6 +34,8 @@ responses = {
         '/accounts/1/lists/303449/custom_fields/1':  ({}, 'custom_fields/1'),
         '/accounts/1/lists/303449/custom_fields/2':  ({}, 'custom_fields/2'),
         '/accounts/1/lists/303449/subscribers':      ({}, 'subscribers/page1'),
+        '/accounts/1/lists/303449/subscribers?ws.size=100': (
+            {}, 'subscribers/page1'),
         '/accounts/1/lists/303449/subscribers/1':    ({}, 'subscribers/1'),
         '/accounts/1/lists/303449/subscribers/2':    ({}, 'subscribers/2'),
         '/accounts/1/lists/505454/subscribers/3':    ({}, 'subscribers/3'),
@@ -46,6 +49,8 @@ responses = {
             {'status': '400'}, 'error'),
         '/accounts/1/lists/303449/subscribers?ws.op=find&' \
                          'email=joe%40example.com': ({}, 'subscribers/find'),
+        '/accounts/1/lists/303449/subscribers?ws.size=50&ws.op=find&' \
+                         'email=joe%40example.com': ({}, 'subscribers/find'),
         '/accounts/1/lists/303449/subscribers?ws.show=total_size&ws.op=find&' \
                          'email=joe%40example.com': ({}, 'subscribers/find_ts'),
          '/accounts/1/lists/303449/broadcasts/total?status=sent': (
@@ -65,6 +70,8 @@ responses = {
         '/accounts/1/lists/303449/subscribers/1': ({
             'status': '201',
             'location': '/accounts/1/lists/505454/subscribers/3'}, None),
+        '/accounts/1/lists/303449/subscribers/2': ({
+            'status': '400'}, 'error'),
         '/accounts/1/lists/303449/broadcasts/2/schedule': ({
             'status': '201',
             'location': '/accounts/1/lists/303449/broadcasts/2/schedule'},
@@ -112,9 +119,9 @@ def _sort_qs_for_url(url):
     return "{0}?{1}".format(parsed.path, "&".join(params))
 
 
-def request(self, url, method, **kwargs):
-    """Return a tuple to simulate calling oauth2.Client.request."""
-    url = _sort_qs_for_url(url)
+def request(method, url, body, headers):
+    """Return the headers and content of the response to a request."""
+    url = _sort_qs_for_url(url.replace(API_BASE, ''))
     (headers, file) = responses[method][url]
     if 'status' not in headers:
         # assume 200 OK if not otherwise specified
@@ -131,9 +138,8 @@ class MockAdapter(OAuthAdapter):
     """Mocked OAuthAdapter."""
     requests = []
 
-    @mock.patch('oauth2.Client.request', request)
     def request(self, method, url, data={}, response='body'):
-        """Mock the oauth.Client.request method"""
+        """Record the requests answered by the stub transport."""
         url = _sort_qs_for_url(url)
         req = super(MockAdapter, self).request(method, url, data, response)
         self.requests.append({'method' : method, 'url' : url, 'data' : data})
@@ -141,4 +147,5 @@ class MockAdapter(OAuthAdapter):
 
     def __init__(self):
         self.user = AWeberUser()
-        return super(MockAdapter, self).__init__('key', 'secret', '')
+        return super(MockAdapter, self).__init__(
+            'key', 'secret', API_BASE, transport=StubTransport(request))
@@ -0,0 +1,82 @@
+"""A local HTTP server answering every request after a delay."""
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from SocketServer import ThreadingMixIn
+import json
+import threading
+import time
+import zlib
+
+__all__ = ['StubServer']
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _respond(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        with server.lock:
+            server.requests.append((self.command, self.path))
+            server.connections.add(self.client_address)
+        time.sleep(server.latency)
+
+        data = {'path': self.path.split('?')[0]}
+        if server.padding:
+            data['padding'] = ' ' * server.padding
+        body = json.dumps(data)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        if server.padding:
+            compressor = zlib.compressobj(
+                6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            body = compressor.compress(body) + compressor.flush()
+            self.send_header('Content-Encoding', 'gzip')
+        with server.lock:
+            server.bytes_sent += len(body)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PATCH = do_DELETE = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    """Answers any request with {"path": path} after latency seconds.
+
+    Keeps the requests and the client addresses of the connections.
+    With padding, the response has that many more spaces and is sent
+    gzipped; bytes_sent counts the body bytes of the responses.
+
+    """
+    daemon_threads = True
+
+    def __init__(self, latency=0, padding=0):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), _Handler)
+        self.latency = latency
+        self.padding = padding
+        self.lock = threading.Lock()
+        self.requests = []
+        self.connections = set()
+        self.bytes_sent = 0
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{0}'.format(self.server_address[1])
+
+    def handle_error(self, request, client_address):
+        # Clients that timed out have hung up before their response.
+        pass
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, args=(0.05,))
+        thread.daemon = True
+        thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
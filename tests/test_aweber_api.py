@@ -1,4 +1,8 @@
 from unittest import TestCase
+import os
+import subprocess
+import sys
+
 from mock_adapter import MockAdapter
 from mock import Mock
 from aweber_api import (AWeberAPI, AWeberUser, ACCESS_TOKEN_URL, AUTHORIZE_URL,
@@ -99,7 +103,20 @@ class WhenGettingAnAccount(TestCase):
 
     def test_when_getting_an_account(self):
         account = self.aweber.get_account(self.access_token, self.token_secret)
-        self.assertEqual(type(account), AWeberEntry)
+        self.assertTrue(isinstance(account, AWeberEntry))
         self.assertEqual(account.id, 1)
         self.assertEqual(account.type, 'account')
 
+
+class WhenImportingTheLibrary(TestCase):
+
+    def test_should_not_import_the_transport(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.Popen([
+            sys.executable, '-c',
+            'import sys; import aweber_api; '
+            'aweber_api.AWeberAPI("key", "secret"); '
+            'print sorted(name for name in ("oauth2", "httplib2") '
+            'if name in sys.modules)'], cwd=root,
+            stdout=subprocess.PIPE).communicate()[0]
+        self.assertEqual(output.strip(), '[]')
@@ -1,7 +1,10 @@
 import json
 from unittest import TestCase
 
+from mock import Mock
+
 from aweber_api import AWeberAPI, AWeberCollection, AWeberEntry
+from aweber_api.collection import CollectionSlice
 from aweber_api.base import API_BASE, APIException
 from mock_adapter import MockAdapter
 
@@ -23,20 +26,20 @@ class TestAWeberCollection(TestCase):
     def test_should_be_able_get_each_via_offset(self):
         for i in range(0, 23):
             list = self.lists[i]
-            self.assertEqual(type(list), AWeberEntry)
+            self.assertTrue(isinstance(list, AWeberEntry))
             self.assertEqual(list.type, 'list')
 
     def test_should_be_able_to_iterate_on_collection(self):
         list_number = 0
         for list in self.lists:
-            self.assertEqual(type(list), AWeberEntry)
+            self.assertTrue(isinstance(list, AWeberEntry))
             self.assertEqual(list.type, 'list')
             list_number += 1
         self.assertEqual(list_number, 24)
 
     def test_should_support_get_by_id(self):
         list = self.lists.get_by_id(303449)
-        self.assertEqual(type(list), AWeberEntry)
+        self.assertTrue(isinstance(list, AWeberEntry))
         self.assertEqual(list.type, 'list')
         self.assertEqual(list.id, 303449)
 
@@ -68,6 +71,244 @@ class TestAWeberCollection(TestCase):
             assert subscriber.url == subscriber.self_link.replace(API_BASE, '')
 
 
+class TestPageSize(TestCase):
+
+    def setUp(self):
+        self.aweber = AWeberAPI('1', '2')
+        self.aweber.adapter = MockAdapter()
+        self.aweber.adapter.requests = []
+        self.lists = self.aweber.load_from_url('/accounts/1/lists', 20)
+
+    def test_should_request_page_size_on_first_load(self):
+        request = self.aweber.adapter.requests[0]
+        self.assertEqual(request['data'], {'ws.size': 20})
+
+    def test_should_use_requested_page_size(self):
+        self.assertEqual(self.lists.page_size, 20)
+        self.assertEqual(self.lists._get_page_params(25),
+                         {'ws.start': 20, 'ws.size': 20})
+
+    def test_should_not_overwrite_requested_page_size(self):
+        self.lists.set_page_size(10)
+        self.lists._load_page_for_offset(20)
+        self.assertEqual(self.lists.page_size, 10)
+        self.assertEqual(self.aweber.adapter.requests[1]['data'],
+                         {'ws.start': 20, 'ws.size': 10})
+
+    def test_should_use_page_size_from_api_by_default(self):
+        lists = self.aweber.load_from_url('/accounts/1/lists')
+        self.assertEqual(lists._get_page_params(25),
+                         {'ws.start': 20, 'ws.size': 20})
+
+    def test_should_request_page_size_on_find(self):
+        subscribers = self.aweber.load_from_url(
+            '/accounts/1/lists/303449/subscribers')
+        self.aweber.adapter.requests = []
+        found = subscribers.find(page_size=50, email='joe@example.com')
+        self.assertEqual(self.aweber.adapter.requests[0]['data'],
+                         {'ws.size': 50})
+        self.assertEqual(found.page_size, 50)
+        self.assertEqual(found.url, '/accounts/1/lists/303449/subscribers'
+                         '?ws.op=find&email=joe%40example.com')
+
+
+class TestFetchingRanges(TestCase):
+
+    def setUp(self):
+        self.aweber = AWeberAPI('1', '2')
+        self.aweber.adapter = MockAdapter()
+        self.lists = self.aweber.load_from_url('/accounts/1/lists')
+        self.lists.set_page_cache_limits(max_pages=1)
+        self.lists._load_page_for_offset(20)
+        self.aweber.adapter.requests = []
+
+    def test_should_return_slice(self):
+        lists = self.lists.fetch_range(0, 24)
+        self.assertTrue(isinstance(lists, CollectionSlice))
+        self.assertEqual(len(lists), 24)
+
+    def test_should_only_request_missing_offsets(self):
+        self.lists.set_page_size(20)
+        self.lists.fetch_range(0, 24)
+        self.assertEqual(len(self.aweber.adapter.requests), 1)
+        self.assertEqual(self.aweber.adapter.requests[0]['data'],
+                         {'ws.start': 0, 'ws.size': 20})
+
+    def test_should_not_request_cached_range(self):
+        self.lists.fetch_range(20, 24)
+        self.assertEqual(self.aweber.adapter.requests, [])
+
+    def test_should_create_entries(self):
+        lists = self.lists.fetch_range(20, 24)
+        self.assertEqual(lists[0].id, self.lists[20].id)
+        self.assertEqual([list.id for list in lists],
+                         [self.lists[i].id for i in range(20, 24)])
+
+    def test_should_support_slicing(self):
+        lists = self.lists[21:30]
+        self.assertEqual(len(lists), 3)
+        self.assertEqual(lists[-1].id, self.lists[23].id)
+        self.assertEqual(len(lists[1:]), 2)
+
+    def test_should_support_slice_steps(self):
+        lists = self.lists[23:19:-2]
+        self.assertEqual([list.id for list in lists],
+                         [self.lists[23].id, self.lists[21].id])
+
+    def test_should_split_range_into_pages(self):
+        self.lists.max_page_size = 10
+        self.assertEqual(self.lists._get_range_params(range(0, 15) + [20]), [
+            {'ws.start': 0, 'ws.size': 10},
+            {'ws.start': 10, 'ws.size': 5},
+            {'ws.start': 20, 'ws.size': 1},
+        ])
+
+
+class TestIteratingRaw(TestCase):
+
+    def setUp(self):
+        self.aweber = AWeberAPI('1', '2')
+        self.aweber.adapter = MockAdapter()
+        self.lists = self.aweber.load_from_url('/accounts/1/lists')
+        self.aweber.adapter.requests = []
+
+    def test_should_yield_entry_data(self):
+        lists = list(self.lists.iter_raw())
+        self.assertEqual(len(lists), self.lists.total_size)
+        self.assertEqual([data['id'] for data in lists],
+                         [entry.id for entry in self.lists])
+
+    def test_should_yield_dicts(self):
+        data = next(self.lists.iter_raw())
+        self.assertEqual(type(data), dict)
+
+    def test_should_not_request_cached_pages(self):
+        list(self.lists.iter_raw())
+        self.assertEqual(self.aweber.adapter.requests, [])
+
+    def test_should_load_evicted_pages(self):
+        self.lists.set_page_cache_limits(max_pages=1)
+        self.lists._load_page_for_offset(20)
+        self.aweber.adapter.requests = []
+        self.assertEqual(len(list(self.lists.iter_raw())), 24)
+        self.assertEqual(len(self.aweber.adapter.requests), 1)
+        self.assertEqual(self.aweber.adapter.requests[0]['data'],
+                         {'ws.start': 0, 'ws.size': 20})
+
+    def test_should_not_create_entries(self):
+        list(self.lists.iter_raw())
+        self.assertEqual(self.lists.page_cache.get_entry(0), None)
+
+
+class TestFetchingRangesConcurrently(TestCase):
+
+    def setUp(self):
+        self.adapter = Mock()
+        self.adapter.get_deadline.return_value = None
+        self.adapter.request = self.request
+        self.collection = AWeberCollection('/accounts/1/lists', {
+            'total_size': 250, 'start': 0, 'entries': [],
+        }, self.adapter)
+
+    def request(self, method, url, data):
+        start = data['ws.start']
+        return {'start': start, 'entries': [
+            {'id': offset} for offset in range(start, start + data['ws.size'])
+        ]}
+
+    def test_should_fetch_all_pages(self):
+        lists = self.collection.fetch_range(5, 250, concurrency=3)
+        self.assertEqual([item['id'] for item in lists.data], range(5, 250))
+
+
+class TestShortPages(TestCase):
+
+    def setUp(self):
+        self.adapter = Mock()
+        self.adapter.request = self.request
+        self.adapter.session.get.return_value = None
+        self.requests = []
+        self.collection = AWeberCollection('/accounts/1/lists', {
+            'total_size': 30, 'start': 0, 'entries': [],
+        }, self.adapter)
+
+    def request(self, method, url, data):
+        # Returns at most 4 entries, whatever the size requested.
+        self.requests.append(data)
+        start = data['ws.start']
+        stop = min(start + data['ws.size'], start + 4, 30)
+        return {'start': start, 'entries': [
+            {'id': offset, 'self_link': API_BASE + '/lists/{0}'.format(offset),
+             'resource_type_link': API_BASE + '/#list'}
+            for offset in range(start, stop)]}
+
+    def test_should_cap_page_size(self):
+        self.collection.set_page_size(500)
+        self.assertEqual(self.collection.page_size, 100)
+
+    def test_should_index_past_short_page(self):
+        self.collection.set_page_size(10)
+        self.assertEqual(self.collection[7].id, 7)
+        self.assertEqual(self.requests[-1], {'ws.start': 7, 'ws.size': 10})
+
+    def test_should_fetch_range_of_short_pages(self):
+        lists = self.collection.fetch_range(0, 30)
+        self.assertEqual([item['id'] for item in lists.data], range(30))
+
+    def test_should_iterate_raw_over_short_pages(self):
+        self.collection.set_page_size(10)
+        self.assertEqual([item['id'] for item in self.collection.iter_raw()],
+                         range(30))
+
+    def test_should_raise_on_missing_offset(self):
+        self.collection._data['total_size'] = 40
+        self.collection.set_page_size(10)
+        self.assertRaises(ValueError, self.collection.fetch_range, 0, 40)
+        self.assertRaises(ValueError, self.collection.__getitem__, 35)
+
+
+class TestBoundedPageCache(TestCase):
+
+    def setUp(self):
+        self.aweber = AWeberAPI('1', '2')
+        self.aweber.adapter = MockAdapter()
+        self.lists = self.aweber.load_from_url('/accounts/1/lists')
+        self.lists.set_page_cache_limits(max_pages=1)
+        self.aweber.adapter.requests = []
+
+    def test_should_iterate_all_entries(self):
+        self.assertEqual(len([list for list in self.lists]), 24)
+
+    def test_should_evict_pages(self):
+        self.lists._load_page_for_offset(20)
+        self.assertEqual(len(self.lists.page_cache), 1)
+        self.assertEqual(self.lists.page_cache.evictions, 1)
+        self.assertFalse(0 in self.lists.page_cache)
+
+    def test_should_reload_evicted_page(self):
+        self.lists._load_page_for_offset(20)
+        self.lists[0]
+        self.assertEqual(len(self.aweber.adapter.requests), 2)
+        self.assertEqual(self.aweber.adapter.requests[1]['data'],
+                         {'ws.start': 0, 'ws.size': 20})
+
+    def test_should_report_stats(self):
+        self.lists[0]
+        self.lists[0]
+        stats = self.lists.page_cache.stats()
+        self.assertEqual(stats['hits'], 2)
+        self.assertEqual(stats['misses'], 0)
+        self.assertEqual(stats['pages'], 1)
+
+    def test_should_bound_pages_by_default(self):
+        lists = self.aweber.load_from_url('/accounts/1/lists')
+        self.assertEqual(lists.page_cache.max_pages, 100)
+
+    def test_should_count_loaded_pages_when_bounding_bytes(self):
+        self.lists.set_page_cache_limits(max_bytes=10 ** 9)
+        self.assertTrue(self.lists.page_cache.bytes > 0)
+
+
 class TestWhenCreatingCustomFieldsFails(TestCase):
 
     def setUp(self):
@@ -152,14 +393,21 @@ class TestGettingParentEntry(TestCase):
 
     def test_lists_parent_should_be_account(self):
         entry = self.lists.get_parent_entry()
-        self.assertEqual(type(entry), AWeberEntry)
+        self.assertTrue(isinstance(entry, AWeberEntry))
         self.assertEqual(entry.type, 'account')
 
     def test_custom_fields_parent_should_be_list(self):
         entry = self.custom_fields.get_parent_entry()
-        self.assertEqual(type(entry), AWeberEntry)
+        self.assertTrue(isinstance(entry, AWeberEntry))
         self.assertEqual(entry.type, 'list')
 
     def test_accounts_parent_should_be_none(self):
         entry = self.accounts.get_parent_entry()
         self.assertEqual(entry, None)
+
+    def test_should_return_entry_navigated_from(self):
+        list = self.aweber.load_from_url('/accounts/1/lists/303449')
+        self.aweber.adapter.requests = []
+        entry = list.custom_fields.get_parent_entry()
+        self.assertTrue(entry is list)
+        self.assertEqual(len(self.aweber.adapter.requests), 1)
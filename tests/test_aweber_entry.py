@@ -1,9 +1,12 @@
+import copy
+import pickle
 import re
 from unittest import TestCase
 from urllib import urlencode
 
 from aweber_api import AWeberAPI, AWeberCollection, AWeberEntry
 from aweber_api.base import APIException
+from aweber_api.entry import entry_class, entry_classes
 from mock_adapter import MockAdapter
 
 
@@ -15,7 +18,7 @@ class TestAWeberEntry(TestCase):
         self.list = self.aweber.load_from_url('/accounts/1/lists/303449')
 
     def test_should_be_an_entry(self):
-        self.assertEqual(type(self.list), AWeberEntry)
+        self.assertTrue(isinstance(self.list, AWeberEntry))
         self.assertEqual(self.list.type, 'list')
 
     def test_should_have_id(self):
@@ -28,11 +31,96 @@ class TestAWeberEntry(TestCase):
         campaigns = self.list.campaigns
         self.assertEqual(type(campaigns), AWeberCollection)
 
+    def test_should_get_child_collection_with_page_size(self):
+        self.aweber.adapter.requests = []
+        subscribers = self.list.get_collection('subscribers', page_size=100)
+        self.assertEqual(type(subscribers), AWeberCollection)
+        self.assertEqual(subscribers.page_size, 100)
+        self.assertEqual(self.aweber.adapter.requests[0]['data'],
+                         {'ws.size': 100})
+        self.assertTrue(self.list.subscribers is subscribers)
+
+    def test_should_not_get_unknown_child_collection(self):
+        self.assertRaises(AttributeError, self.list.get_collection, 'opens')
+
     def test_findSubscribers_should_handle_errors(self):
         account = self.aweber.load_from_url('/accounts/1')
         self.assertRaises(APIException, account.findSubscribers, name='bob')
 
 
+class TestTypedEntryClasses(TestCase):
+
+    def setUp(self):
+        self.aweber = AWeberAPI('1', '2')
+        self.aweber.adapter = MockAdapter()
+        self.list = self.aweber.load_from_url('/accounts/1/lists/303449')
+
+    def test_should_have_class_per_type(self):
+        for type in AWeberEntry.collections_map:
+            self.assertTrue(issubclass(entry_classes[type], AWeberEntry))
+
+    def test_should_name_classes_after_type(self):
+        self.assertEqual(entry_class('list').__name__, 'ListEntry')
+        self.assertEqual(entry_class('web_form_split_test').__name__,
+                         'WebFormSplitTestEntry')
+
+    def test_should_create_typed_entry(self):
+        self.assertEqual(type(self.list), entry_classes['list'])
+        self.assertEqual(self.list.type, 'list')
+
+    def test_should_have_child_collection_descriptors(self):
+        self.assertTrue('campaigns' in type(self.list).__dict__)
+        self.assertEqual(type(self.list.campaigns), AWeberCollection)
+
+    def test_should_read_fields_without_changing_class(self):
+        partial = AWeberEntry('/accounts/1/lists/1', {
+            'id': 1,
+            'resource_type_link': 'https://api.aweber.com/1.0/#list',
+        }, self.aweber.adapter)
+        self.assertRaises(AttributeError, getattr, partial, 'name')
+        self.assertEqual(self.list.name, 'default303449')
+        self.assertFalse('name' in type(self.list).__dict__)
+
+    def test_should_define_classes_of_known_types_in_module(self):
+        from aweber_api.entry import ListEntry, SubscriberEntry
+        self.assertTrue(entry_class('list') is ListEntry)
+        self.assertTrue(entry_class('subscriber') is SubscriberEntry)
+        self.assertTrue('subscribers' in ListEntry.__dict__)
+
+    def test_should_not_add_generated_classes_to_module(self):
+        import aweber_api.entry
+        entry_class('a_weber')
+        self.assertTrue(aweber_api.entry.AWeberEntry is AWeberEntry)
+        self.assertFalse(hasattr(aweber_api.entry, 'OpenEntry'))
+
+    def test_should_copy(self):
+        entry = copy.copy(self.list)
+        self.assertEqual(type(entry), type(self.list))
+        self.assertEqual(entry.name, 'default303449')
+        self.assertTrue(entry.adapter is self.list.adapter)
+
+    def test_should_pickle(self):
+        self.list.name = 'renamed'
+        entry = pickle.loads(pickle.dumps(self.list, 2))
+        self.assertEqual(type(entry), type(self.list))
+        self.assertEqual(entry.url, self.list.url)
+        self.assertEqual(entry.name, 'renamed')
+        self.assertEqual(entry._get_diff(), {'name': 'renamed'})
+        self.assertEqual(entry.adapter, None)
+
+    def test_should_generate_class_for_unknown_type(self):
+        entry = AWeberEntry('/opens/1', {
+            'resource_type_link': 'https://api.aweber.com/1.0/#open',
+            'id': 1,
+        }, self.aweber.adapter)
+        self.assertEqual(type(entry).__name__, 'OpenEntry')
+        self.assertEqual(entry.id, 1)
+
+    def test_should_not_type_entry_without_resource_type(self):
+        entry = AWeberEntry('/anything', {'id': 1}, self.aweber.adapter)
+        self.assertEqual(type(entry), AWeberEntry)
+
+
 class AccountTestCase(TestCase):
 
     def setUp(self):
@@ -52,7 +140,7 @@ class ListTestCase(TestCase):
 class TestAWeberAccountEntry(AccountTestCase):
 
     def test_should_be_an_entry(self):
-        self.assertEqual(type(self.account), AWeberEntry)
+        self.assertTrue(isinstance(self.account, AWeberEntry))
         self.assertEqual(self.account.type, 'account')
 
 
@@ -70,7 +158,7 @@ class TestAccountGetWebForms(AccountTestCase):
 
     def test_each_should_be_entry(self):
         for entry in self.forms:
-            self.assertEqual(type(entry), AWeberEntry)
+            self.assertTrue(isinstance(entry, AWeberEntry))
             self.assertEqual(entry.type, 'web_form')
 
     def test_each_should_have_correct_url(self):
@@ -93,7 +181,7 @@ class TestAccountGetWebFormSplitTests(AccountTestCase):
 
     def test_each_should_be_entry(self):
         for entry in self.forms:
-            self.assertEqual(type(entry), AWeberEntry)
+            self.assertTrue(isinstance(entry, AWeberEntry))
             self.assertEqual(entry.type, 'web_form_split_test')
 
     def test_each_should_have_correct_url(self):
@@ -237,6 +325,19 @@ class TestGetAndSetData(SubscriberTestCase):
         self.subscriber.name = 'Randy Rhodes'
         self.assertEqual(self.subscriber.name, 'Randy Rhodes')
 
+    def test_set_name_after_reading_it(self):
+        self.assertEqual(self.subscriber.name, 'Joe Jones')
+        self.subscriber.name = 'Randy Rhodes'
+        self.assertEqual(self.subscriber.name, 'Randy Rhodes')
+        self.assertEqual(self.subscriber._diff, {'name': 'Randy Rhodes'})
+
+    def test_should_not_shadow_entry_attributes(self):
+        self.subscriber._data['url'] = 'http://example.com'
+        self.subscriber._data['save'] = 'yes'
+        self.assertEqual(self.subscriber.url,
+                         '/accounts/1/lists/303449/subscribers/1')
+        self.assertTrue(callable(self.subscriber.save))
+
     def test_get_custom_fields(self):
         fields = self.subscriber.custom_fields
         self.assertEqual(fields['Color'], 'blue')
@@ -247,6 +348,51 @@ class TestGetAndSetData(SubscriberTestCase):
         fields = self.subscriber.custom_fields
         self.assertEqual(fields['Color'], 'Red')
 
+    def test_should_reuse_custom_fields_view(self):
+        fields = self.subscriber.custom_fields
+        self.assertTrue(self.subscriber.custom_fields is fields)
+
+    def test_should_track_changed_custom_fields(self):
+        self.subscriber.custom_fields['Color'] = 'Red'
+        self.subscriber.custom_fields['test'] = 'yes'
+        self.assertEqual(self.subscriber._get_diff(),
+                         {'custom_fields': {'Color': 'Red', 'test': 'yes'}})
+
+    def test_should_replace_view_when_setting_dict(self):
+        fields = self.subscriber.custom_fields
+        self.subscriber.custom_fields = {'Color': 'Green'}
+        self.assertFalse(self.subscriber.custom_fields is fields)
+        self.assertEqual(self.subscriber._get_diff(),
+                         {'custom_fields': {'Color': 'Green'}})
+
+    def test_should_keep_whole_dict_when_changing_its_view(self):
+        self.subscriber.custom_fields = {'Color': 'Green', 'Size': 'L'}
+        self.subscriber.custom_fields['Color'] = 'Red'
+        self.assertEqual(self.subscriber._get_diff(),
+                         {'custom_fields': {'Color': 'Red', 'Size': 'L'}})
+
+    def test_should_track_view_changes_after_saving_whole_dict(self):
+        self.subscriber.custom_fields = {'Color': 'Green', 'Size': 'L'}
+        self.subscriber.custom_fields['Color'] = 'Red'
+        self.subscriber._reset_diff()
+        self.subscriber.custom_fields['Size'] = 'S'
+        self.assertEqual(self.subscriber._get_diff(),
+                         {'custom_fields': {'Size': 'S'}})
+
+    def test_should_keep_tracking_view_changes_after_pickle(self):
+        self.subscriber.custom_fields['Color'] = 'Red'
+        subscriber = pickle.loads(pickle.dumps(self.subscriber, 2))
+        subscriber.custom_fields['test'] = 'yes'
+        self.assertEqual(subscriber._get_diff(),
+                         {'custom_fields': {'Color': 'Red', 'test': 'yes'}})
+
+    def test_should_keep_whole_dict_after_pickle(self):
+        self.subscriber.custom_fields = {'Color': 'Green'}
+        subscriber = pickle.loads(pickle.dumps(self.subscriber, 2))
+        subscriber.custom_fields['Size'] = 'L'
+        self.assertEqual(subscriber._get_diff(),
+                         {'custom_fields': {'Color': 'Green', 'Size': 'L'}})
+
     def test_should_be_able_get_activity(self):
         activity = self.subscriber.get_activity()
 
@@ -293,6 +439,12 @@ class TestMovingSubscribers(TestCase):
     def test_should_reset_diff(self):
         self.assertEqual(self.subscriber._diff, {})
 
+    def test_should_read_refreshed_data(self):
+        self.subscriber._set_data({'id': 50205517})
+        self.assertEqual(self.subscriber.id, 50205517)
+        self.move_subscriber()
+        self.assertEqual(self.subscriber.id, 52629234)
+
     def test_should_accept_last_followup_message_number_sent(self):
         self.move_subscriber(last_followup_message_number_sent=999)
         expected_params = {'ws.op': 'move', 'list_link': self.list.self_link,
@@ -328,10 +480,12 @@ class TestSavingSubscriberData(SubscriberTestCase):
     def test_should_not_include_unchanged_data(self):
         self.assertFalse('email' in self.req['data'])
 
-    def test_should_given_all_custom_fields(self):
-        # Make changed, Model did not
-        self.assertEqual(self.req['data']['custom_fields']['Color'], 'Red')
-        self.assertEqual(self.req['data']['custom_fields']['Walruses'], '')
+    def test_should_give_changed_custom_fields(self):
+        self.assertEqual(self.req['data']['custom_fields'], {'Color': 'Red'})
+
+    def test_should_reset_diff(self):
+        self.assertEqual(self.subscriber._diff, {})
+        self.assertEqual(self.subscriber.custom_fields.diff(), {})
 
 
 class TestSavingInvalidSubscriberData(TestCase):
@@ -392,14 +546,59 @@ class TestGettingParentEntry(TestCase):
 
     def test_list_parent_should_be_account(self):
         entry = self.list.get_parent_entry()
-        self.assertEqual(type(entry), AWeberEntry)
+        self.assertTrue(isinstance(entry, AWeberEntry))
         self.assertEqual(entry.type, 'account')
 
     def test_custom_field_parent_should_be_list(self):
         entry = self.custom_field.get_parent_entry()
-        self.assertEqual(type(entry), AWeberEntry)
+        self.assertTrue(isinstance(entry, AWeberEntry))
         self.assertEqual(entry.type, 'list')
 
     def test_account_parent_should_be_none(self):
         entry = self.account.get_parent_entry()
         self.assertEqual(entry, None)
+
+
+class TestGettingKnownParentEntry(TestCase):
+
+    def setUp(self):
+        self.aweber = AWeberAPI('1', '2')
+        self.aweber.adapter = MockAdapter()
+        self.list = self.aweber.load_from_url('/accounts/1/lists/303449')
+        self.subscriber = self.list.subscribers[0]
+        self.aweber.adapter.requests = []
+
+    def test_should_return_entry_navigated_from(self):
+        self.assertTrue(self.subscriber.get_parent_entry() is self.list)
+
+    def test_should_not_make_request(self):
+        self.subscriber.get_parent_entry()
+        self.assertEqual(self.aweber.adapter.requests, [])
+
+    def test_should_find_parent_in_identity_map(self):
+        custom_field = self.aweber.load_from_url(
+            '/accounts/1/lists/303449/custom_fields/1')
+        self.aweber.adapter.requests = []
+        self.assertTrue(custom_field.get_parent_entry() is self.list)
+        self.assertEqual(self.aweber.adapter.requests, [])
+
+    def test_should_request_unknown_parent(self):
+        del self.list
+        entry = self.subscriber.get_parent_entry()
+        self.assertEqual(entry.type, 'list')
+        self.assertEqual(len(self.aweber.adapter.requests), 1)
+
+
+class TestListIterBroadcasts(ListTestCase):
+
+    def setUp(self):
+        super(TestListIterBroadcasts, self).setUp()
+        self.aweber.adapter.requests = []
+
+    def test_should_not_request_anything_until_iterated(self):
+        self.list_.iter_broadcasts(status='sent')
+        self.assertEqual(self.aweber.adapter.requests, [])
+
+    def test_should_not_request_total(self):
+        self.assertEqual(list(self.list_.iter_broadcasts(status='sent')), [])
+        self.assertEqual(len(self.aweber.adapter.requests), 1)
@@ -0,0 +1,85 @@
+from unittest import TestCase
+import socket
+
+from aweber_api import API_BASE, AWeberAPI, APIException
+from aweber_api.broadcasts import (
+    cancel_broadcasts,
+    poll_broadcasts,
+    schedule_broadcasts,
+)
+from mock_adapter import MockAdapter
+
+
+class BroadcastsTestCase(TestCase):
+
+    def setUp(self):
+        self.aweber = AWeberAPI('1', '2')
+        self.aweber.adapter = MockAdapter()
+        self.list_ = self.aweber.load_from_url('/accounts/1/lists/303449')
+        self.aweber.adapter.requests = []
+
+
+class TestSchedulingBroadcasts(BroadcastsTestCase):
+
+    def setUp(self):
+        super(TestSchedulingBroadcasts, self).setUp()
+        self.results = schedule_broadcasts(
+            [(self.list_, 2), (self.list_, 3)], '2014-09-06 18:55:00',
+            concurrency=2)
+
+    def test_should_schedule_all_broadcasts(self):
+        requests = self.aweber.adapter.transport.requests
+        self.assertEqual(sorted(request['url'] for request in requests
+                                if request['method'] == 'POST'), [
+            API_BASE + '/accounts/1/lists/303449/broadcasts/2/schedule',
+            API_BASE + '/accounts/1/lists/303449/broadcasts/3/schedule',
+        ])
+
+    def test_should_return_status(self):
+        self.assertEqual(self.results[0].broadcast_id, 2)
+        self.assertEqual(self.results[0].status, 201)
+        self.assertEqual(self.results[0].error, None)
+
+    def test_should_return_errors(self):
+        self.assertEqual(self.results[1].status, None)
+        self.assertTrue(isinstance(self.results[1].error, APIException))
+
+
+class TestSchedulingBroadcastsOverBrokenConnection(BroadcastsTestCase):
+
+    def test_should_return_connection_errors(self):
+        transport = self.aweber.adapter.transport
+        request = transport.request
+
+        def broken_request(url, method='GET', body=None, headers=None):
+            if url.endswith('/3/schedule'):
+                raise socket.error('Connection reset by peer')
+            return request(url, method, body, headers)
+
+        transport.request = broken_request
+        results = schedule_broadcasts(
+            [(self.list_, 2), (self.list_, 3)], '2014-09-06 18:55:00',
+            concurrency=2)
+        self.assertEqual(results[0].status, 201)
+        self.assertTrue(isinstance(results[1].error, socket.error))
+        self.assertEqual(results[1].status, None)
+
+
+class TestCancelingBroadcasts(BroadcastsTestCase):
+
+    def test_should_cancel_all_broadcasts(self):
+        results = cancel_broadcasts([(self.list_, 2), (self.list_, 3)])
+        self.assertEqual([result.status for result in results], [204, None])
+
+
+class TestPollingBroadcasts(BroadcastsTestCase):
+
+    def test_should_return_broadcasts_by_list(self):
+        broadcasts = poll_broadcasts([self.list_], 'sent')
+        self.assertEqual(broadcasts, {self.list_.url: []})
+
+    def test_should_not_request_total(self):
+        poll_broadcasts([self.list_], 'sent')
+        self.assertEqual([request['url'] for request
+                          in self.aweber.adapter.requests],
+                         ['/accounts/1/lists/303449/broadcasts?status=sent'])
@@ -0,0 +1,130 @@
+from unittest import TestCase
+import json
+
+import mock
+
+from aweber_api import (
+    API_BASE,
+    APIException,
+    AWeberAPI,
+    AWeberEntry,
+    AWeberUser,
+    OAuthAdapter,
+)
+from aweber_api.bulk import delete_many, move_many
+from aweber_api.transport import StubTransport
+from mock_adapter import MockAdapter
+
+
+class BulkTestCase(TestCase):
+
+    def setUp(self):
+        self.aweber = AWeberAPI('1', '2')
+        self.aweber.adapter = MockAdapter()
+        self.subscriber = self.aweber.load_from_url(
+            '/accounts/1/lists/303449/subscribers/1')
+        self.other = self.aweber.load_from_url(
+            '/accounts/1/lists/303449/subscribers/2')
+        self.list_ = self.aweber.load_from_url('/accounts/1/lists/505454')
+        self.aweber.adapter.requests = []
+
+
+class TestMovingMany(BulkTestCase):
+
+    def setUp(self):
+        super(TestMovingMany, self).setUp()
+        self.report = move_many(
+            [(self.subscriber, {'last_followup_message_number_sent': 2}),
+             self.other],
+            self.list_, concurrency=2, last_followup_message_number_sent=1)
+
+    def test_should_report_each_subscriber(self):
+        self.assertEqual([result.entry for result in self.report],
+                         [self.subscriber, self.other])
+
+    def test_should_report_new_location(self):
+        self.assertEqual([result.value for result in self.report.succeeded],
+                         ['/accounts/1/lists/505454/subscribers/3'])
+
+    def test_should_report_failures(self):
+        self.assertEqual(len(self.report.failed), 1)
+        self.assertTrue(self.report.failed[0].entry is self.other)
+        self.assertTrue(isinstance(self.report.failed[0].error, APIException))
+
+    def test_should_use_arguments_of_each_subscriber(self):
+        move = self.aweber.adapter.requests[0]
+        self.assertEqual(move['data'], {
+            'ws.op': 'move', 'list_link': self.list_.self_link,
+            'last_followup_message_number_sent': 2})
+
+    def test_should_reload_moved_subscribers(self):
+        self.assertEqual(self.subscriber.id, 52629234)
+
+
+class TestMovingManyWithoutReloading(BulkTestCase):
+
+    def test_should_not_reload_subscribers(self):
+        report = move_many([self.subscriber], self.list_, reload=False)
+        self.assertEqual(len(report.succeeded), 1)
+        self.assertEqual([request['method'] for request
+                          in self.aweber.adapter.requests], ['POST'])
+
+
+class TestDeletingMany(BulkTestCase):
+
+    def setUp(self):
+        super(TestDeletingMany, self).setUp()
+        self.progress = []
+        self.report = delete_many(
+            [self.subscriber, self.other], concurrency=2,
+            progress=lambda *args: self.progress.append(args))
+
+    def test_should_report_status(self):
+        self.assertEqual([result.value for result in self.report],
+                         [200, None])
+
+    def test_should_report_failures(self):
+        self.assertEqual(self.report.failed[0].error.status, 400)
+
+    def test_should_report_progress(self):
+        self.assertEqual(sorted(done for done, total, result
+                                in self.progress), [1, 2])
+        self.assertEqual(self.progress[0][1], 2)
+
+
+class TestDeletingManyAgain(TestCase):
+
+    def setUp(self):
+        self.responses = []
+        self.adapter = OAuthAdapter('key', 'secret', API_BASE,
+                                    transport=StubTransport(self.respond))
+        self.adapter.user = AWeberUser()
+        url = '/accounts/1/lists/2/subscribers/3'
+        self.subscriber = AWeberEntry(url, {
+            'self_link': API_BASE + url,
+            'resource_type_link': API_BASE + '/#subscriber',
+        }, self.adapter)
+
+    def respond(self, method, url, body, headers):
+        status, error_type = self.responses.pop(0)
+        return {'status': str(status)}, json.dumps({'error': {
+            'type': error_type, 'message': ''}})
+
+    def test_should_count_missing_entries_as_deleted(self):
+        self.responses = [(404, 'NotFoundError')]
+        report = delete_many([self.subscriber])
+        self.assertEqual(report.succeeded[0].value, 404)
+
+    @mock.patch('aweber_api.bulk.time.sleep')
+    def test_should_retry_when_rate_limited(self, sleep):
+        self.responses = [(403, 'RateLimitError'), (429, None), (200, None)]
+        report = delete_many([self.subscriber], backoff=0.5)
+        self.assertEqual(report.succeeded[0].value, 200)
+        self.assertEqual(sleep.call_count, 2)
+        self.assertTrue(sleep.call_args_list[1][0][0] > 0.5)
+
+    @mock.patch('aweber_api.bulk.time.sleep')
+    def test_should_give_up_after_max_retries(self, sleep):
+        self.responses = [(429, None)] * 3
+        report = delete_many([self.subscriber], max_retries=2)
+        self.assertEqual(report.failed[0].error.status, 429)
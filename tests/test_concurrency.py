@@ -0,0 +1,52 @@
+import threading
+import time
+from unittest import TestCase
+
+from aweber_api.concurrency import imap_concurrently, map_concurrently
+
+
+class TestMapConcurrently(TestCase):
+
+    def test_should_keep_order(self):
+        results = map_concurrently(lambda x: x * 2, range(10), concurrency=4)
+        self.assertEqual(results, [x * 2 for x in range(10)])
+
+    def test_should_run_calls_at_the_same_time(self):
+        threads = set()
+
+        def call(item):
+            threads.add(threading.current_thread().ident)
+            time.sleep(0.01)
+
+        map_concurrently(call, range(4), concurrency=4)
+        self.assertTrue(len(threads) > 1)
+
+    def test_should_run_in_caller_thread_without_concurrency(self):
+        threads = set()
+        map_concurrently(
+            lambda item: threads.add(threading.current_thread().ident),
+            range(4))
+        self.assertEqual(threads, set([threading.current_thread().ident]))
+
+    def test_should_raise_exceptions(self):
+        def call(item):
+            if item == 3:
+                raise ValueError(item)
+
+        self.assertRaises(
+            ValueError, map_concurrently, call, range(5), concurrency=2)
+
+
+class TestIMapConcurrently(TestCase):
+
+    def test_should_yield_all_results(self):
+        results = imap_concurrently(lambda x: x * 2, range(10), concurrency=4)
+        self.assertEqual(sorted(results), [x * 2 for x in range(10)])
+
+    def test_should_yield_results_as_they_return(self):
+        def call(item):
+            time.sleep(item)
+            return item
+
+        results = imap_concurrently(call, [0.05, 0], concurrency=2)
+        self.assertEqual(list(results), [0, 0.05])
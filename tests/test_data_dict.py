@@ -23,3 +23,37 @@ class TestDataDict(TestCase):
         self.dict['favorite food'] = 'Pizza'
         self.assertEqual(self.obj.data['favorite food'], 'Pizza')
 
+    def test_contains(self):
+        self.assertTrue('favorite food' in self.dict)
+        self.assertFalse('favorite color' in self.dict)
+
+    def test_iterate_keys(self):
+        self.assertEqual(sorted(self.dict),
+                         ['favorite drink', 'favorite food'])
+        self.assertEqual(sorted(self.dict.keys()), sorted(self.data.keys()))
+        self.assertEqual(sorted(self.dict.items()),
+                         sorted(self.data.items()))
+
+    def test_iterate_without_copying(self):
+        self.assertEqual(sorted(self.dict.iterkeys()), sorted(self.data))
+        self.assertEqual(sorted(self.dict.itervalues()),
+                         sorted(self.data.values()))
+        self.assertEqual(sorted(self.dict.iteritems()),
+                         sorted(self.data.items()))
+        self.assertEqual(sorted(self.dict.values()),
+                         sorted(self.data.values()))
+
+    def test_diff_has_only_changed_keys(self):
+        self.dict['favorite food'] = 'Pizza'
+        self.assertEqual(self.dict.diff(), {'favorite food': 'Pizza'})
+
+    def test_propagates_first_change_only(self):
+        self.dict['favorite food'] = 'Pizza'
+        self.obj.data = None
+        self.dict['favorite drink'] = 'Water'
+        self.assertEqual(self.obj.data, None)
+
+    def test_reset(self):
+        self.dict['favorite food'] = 'Pizza'
+        self.dict.reset()
+        self.assertEqual(self.dict.diff(), {})
@@ -0,0 +1,208 @@
+import threading
+import time
+from unittest import TestCase
+
+from aweber_api import (
+    API_BASE,
+    AWeberCollection,
+    AWeberEntry,
+    AWeberUser,
+    Cancelled,
+    Deadline,
+    DeadlineExceeded,
+    OAuthAdapter,
+    Timeout,
+)
+from aweber_api.transport import StubTransport
+from stub_server import StubServer
+
+
+class TestDeadline(TestCase):
+
+    def test_should_have_no_limit_by_default(self):
+        deadline = Deadline()
+        self.assertEqual(deadline.remaining(), None)
+        self.assertFalse(deadline.expired)
+        deadline.check()
+
+    def test_should_expire(self):
+        deadline = Deadline(0)
+        self.assertEqual(deadline.remaining(), 0)
+        self.assertRaises(DeadlineExceeded, deadline.check)
+
+    def test_should_be_cancelled(self):
+        deadline = Deadline(60)
+        deadline.cancel()
+        self.assertTrue(deadline.cancelled)
+        self.assertRaises(Cancelled, deadline.check)
+
+
+class TestRequestingWithDeadline(TestCase):
+
+    def setUp(self):
+        self.transport = StubTransport()
+        self.transport.add('GET', 'https://api/accounts', {'id': 1})
+        self.adapter = OAuthAdapter(
+            'key', 'secret', 'https://api', transport=self.transport)
+        self.adapter.user = AWeberUser()
+
+    def test_should_not_pass_timeout_by_default(self):
+        self.adapter.request('GET', '/accounts')
+        self.assertEqual(self.transport.requests[0]['timeout'], None)
+
+    def test_should_pass_timeout(self):
+        self.adapter.timeout = 5
+        self.adapter.request('GET', '/accounts')
+        self.assertEqual(self.transport.requests[0]['timeout'], 5)
+
+    def test_should_bound_timeout_by_deadline(self):
+        self.adapter.timeout = 5
+        with self.adapter.deadline(1):
+            self.adapter.request('GET', '/accounts')
+        self.assertTrue(self.transport.requests[0]['timeout'] <= 1)
+
+    def test_should_raise_once_deadline_passed(self):
+        with self.adapter.deadline(0):
+            self.assertRaises(DeadlineExceeded, self.adapter.request,
+                              'GET', '/accounts')
+        self.assertEqual(self.transport.requests, [])
+
+    def test_should_raise_once_cancelled(self):
+        with self.adapter.deadline() as deadline:
+            self.adapter.request('GET', '/accounts')
+            deadline.cancel()
+            self.assertRaises(Cancelled, self.adapter.request,
+                              'GET', '/accounts')
+        self.assertEqual(len(self.transport.requests), 1)
+
+    def test_should_not_pass_zero_timeout(self):
+        with self.adapter.deadline(60) as deadline:
+            deadline.remaining = lambda: 0
+            self.assertRaises(DeadlineExceeded, self.adapter.request,
+                              'GET', '/accounts')
+        self.assertEqual(self.transport.requests, [])
+
+    def test_should_keep_deadline_to_its_thread(self):
+        errors = []
+
+        def request():
+            try:
+                self.adapter.request('GET', '/accounts')
+            except Exception as error:
+                errors.append(error)
+
+        with self.adapter.deadline(0):
+            thread = threading.Thread(target=request)
+            thread.start()
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_should_apply_deadline_to_request_many(self):
+        with self.adapter.deadline(0):
+            results = self.adapter.request_many(
+                [('GET', '/accounts')] * 2, raise_errors=False)
+        self.adapter.close()
+        self.assertTrue(isinstance(results[0], DeadlineExceeded))
+        self.assertEqual(self.transport.requests, [])
+
+    def test_should_restore_previous_deadline(self):
+        with self.adapter.deadline(0):
+            pass
+        self.adapter.request('GET', '/accounts')
+
+
+class TestPaginatingWithDeadline(TestCase):
+
+    def setUp(self):
+        self.transport = StubTransport(self.handler)
+        self.adapter = OAuthAdapter(
+            'key', 'secret', 'https://api', transport=self.transport)
+        self.adapter.user = AWeberUser()
+        self.deadline = Deadline()
+
+    def handler(self, method, url, body, headers):
+        if len(self.transport.requests) == 2:
+            self.deadline.cancel()
+        return {'status': '200'}, (
+            '{"entries": [], "next_collection_link": "https://api/lists"}')
+
+    def test_should_stop_iterating_pages(self):
+        pages = []
+        with self.adapter.deadline(deadline=self.deadline):
+            try:
+                for data in _pages(self.adapter):
+                    pages.append(data)
+            except Cancelled:
+                pass
+        self.assertEqual(len(pages), 2)
+
+
+class TestCancellingConcurrentOperations(TestCase):
+
+    def setUp(self):
+        self.transport = StubTransport(self.handler)
+        self.adapter = OAuthAdapter(
+            'key', 'secret', 'https://api', transport=self.transport)
+        self.adapter.user = AWeberUser()
+        self.deadline = Deadline()
+
+    def handler(self, method, url, body, headers):
+        if url == 'https://api/accounts/1/lists':
+            self.deadline.cancel()
+            return {'status': '200'}, (
+                '{"start": 0, "total_size": 1, "entries": [{"id": 1, '
+                '"self_link": "https://api/accounts/1/lists/1", '
+                '"resource_type_link": "https://api/#list"}]}')
+        return {'status': '200'}, '{"start": 0, "entries": []}'
+
+    def test_should_cancel_concurrent_traversal(self):
+        account = AWeberEntry('/accounts/1', {
+            'id': 1, 'self_link': API_BASE + '/accounts/1',
+            'resource_type_link': API_BASE + '/#account'}, self.adapter)
+        with self.adapter.deadline(deadline=self.deadline):
+            entries = account.traverse(
+                include=['lists', 'subscribers', 'campaigns'], concurrency=4)
+            self.assertRaises(Cancelled, list, entries)
+        self.assertEqual(len(self.transport.requests), 1)
+
+    def test_should_cancel_concurrent_fetch_range(self):
+        lists = AWeberCollection('/accounts/1/lists', {
+            'start': 0, 'total_size': 250, 'entries': []}, self.adapter)
+        with self.adapter.deadline() as deadline:
+            deadline.cancel()
+            self.assertRaises(Cancelled, lists.fetch_range, 0, 250,
+                              concurrency=3)
+        self.assertEqual(self.transport.requests, [])
+
+
+def _pages(adapter):
+    data = adapter.request('GET', '/lists')
+    while True:
+        yield data
+        data = adapter.request('GET', data['next_collection_link'])
+
+
+class TestTimingOutAgainstServer(TestCase):
+
+    def setUp(self):
+        self.server = StubServer(latency=0.5)
+        self.server.start()
+        self.adapter = OAuthAdapter('key', 'secret', self.server.url)
+        self.adapter.user = AWeberUser()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_should_time_out(self):
+        self.adapter.timeout = 0.1
+        started = time.time()
+        self.assertRaises(Timeout, self.adapter.request,
+                          'GET', '/accounts')
+        self.assertTrue(time.time() - started < 0.4)
+
+    def test_should_time_out_at_deadline(self):
+        started = time.time()
+        with self.adapter.deadline(0.1):
+            self.assertRaises(Timeout, self.adapter.request,
+                              'GET', '/accounts')
+        self.assertTrue(time.time() - started < 0.4)
@@ -0,0 +1,123 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from aweber_api import API_BASE, AWeberUser, DiskCache, OAuthAdapter
+from aweber_api.transport import StubTransport
+from mock_adapter import MockAdapter
+
+
+class DiskCacheTestCase(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'cache.db')
+        self.cache = DiskCache(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+
+class TestDiskCache(DiskCacheTestCase):
+
+    def test_should_return_cached_body(self):
+        self.cache.set('key', '/accounts', '{"entries": []}', 60)
+        self.assertEqual(self.cache.get('key'), '{"entries": []}')
+
+    def test_should_not_return_expired_body(self):
+        self.cache.set('key', '/accounts', '{"entries": []}', -1)
+        self.assertEqual(self.cache.get('key'), None)
+
+    def test_should_delete_expired_rows_on_write(self):
+        self.cache.set('old', '/accounts', '{}', -1)
+        self.cache.set('key', '/accounts', '{}', 60)
+        count = self.cache._connect().execute(
+            'SELECT COUNT(*) FROM responses').fetchone()[0]
+        self.assertEqual(count, 1)
+
+    def test_should_share_bodies_across_connections(self):
+        self.cache.set('key', '/accounts', '{"entries": []}', 60)
+        self.assertEqual(DiskCache(self.path).get('key'), '{"entries": []}')
+
+    def test_should_only_cache_urls_with_ttl(self):
+        self.assertEqual(self.cache.get_ttl('/accounts/1/lists'), 3600)
+        self.assertEqual(
+            self.cache.get_ttl('/accounts/1?ws.op=getWebForms'), 3600)
+        self.assertEqual(
+            self.cache.get_ttl('/accounts/1/lists/1/subscribers'), None)
+
+    def test_should_not_cache_searches(self):
+        self.assertEqual(
+            self.cache.get_ttl('/accounts/1/lists?ws.start=20'), 3600)
+        self.assertEqual(
+            self.cache.get_ttl('/accounts/1/lists?ws.op=find&name=x'), None)
+        self.assertEqual(self.cache.get_ttl(
+            '/accounts/1/lists/1/custom_fields?ws.op=find'), None)
+
+    def test_should_use_given_ttls(self):
+        cache = DiskCache(self.path, ttls=[(r'/subscribers$', 10)])
+        self.assertEqual(cache.get_ttl('/accounts/1/lists/1/subscribers'), 10)
+        self.assertEqual(cache.get_ttl('/accounts/1/lists'), None)
+
+    def test_should_key_by_token(self):
+        self.assertTrue(self.cache.get_key('/accounts', 'a') !=
+                        self.cache.get_key('/accounts', 'b'))
+
+    def test_should_invalidate_collection_of_url(self):
+        for url in ['/accounts/1/lists', '/accounts/1/lists?ws.size=20',
+                    '/accounts/1/lists/2', '/accounts/1']:
+            self.cache.set(url, url, '{}', 60)
+        self.cache.invalidate('/accounts/1/lists/3')
+        self.assertEqual(self.cache.get('/accounts/1/lists'), None)
+        self.assertEqual(self.cache.get('/accounts/1/lists?ws.size=20'), None)
+        self.assertEqual(self.cache.get('/accounts/1/lists/2'), None)
+        self.assertEqual(self.cache.get('/accounts/1'), '{}')
+
+
+class TestCachingRequests(DiskCacheTestCase):
+
+    def setUp(self):
+        super(TestCachingRequests, self).setUp()
+        self.adapter = MockAdapter()
+        self.adapter.cache = self.cache
+        self.lists = self.adapter.request('GET', '/accounts/1/lists')
+
+    def get_adapter(self):
+        self.transport = StubTransport()
+        self.transport.add('GET', API_BASE + '/accounts/1/lists', {
+            'entries': []})
+        adapter = OAuthAdapter('key', 'secret', API_BASE,
+                               DiskCache(self.path), self.transport)
+        adapter.user = AWeberUser()
+        return adapter
+
+    def test_should_read_cached_response(self):
+        lists = self.get_adapter().request('GET', '/accounts/1/lists')
+        self.assertEqual(lists, self.lists)
+        self.assertEqual(self.transport.requests, [])
+
+    def test_should_not_share_responses_across_tokens(self):
+        adapter = self.get_adapter()
+        adapter.user.access_token = 'other'
+        adapter.user.token_secret = 'secret'
+        self.assertEqual(adapter.request('GET', '/accounts/1/lists'), {
+            'entries': []})
+        self.assertEqual(len(self.transport.requests), 1)
+
+    def test_should_not_cache_uncached_urls(self):
+        self.adapter.request('GET', '/accounts/1/lists/303449/subscribers')
+        key = self.cache.get_key(
+            '/accounts/1/lists/303449/subscribers', ('key', None))
+        self.assertEqual(self.cache.get(key), None)
+
+    def test_should_invalidate_on_changes(self):
+        self.adapter.request(
+            'PATCH', '/accounts/1/lists/303449/subscribers/1', {})
+        self.adapter.request('GET', '/accounts/1/lists/303449/custom_fields')
+        self.adapter.request(
+            'POST', '/accounts/1/lists/303449/custom_fields',
+            {'ws.op': 'create', 'name': 'x'}, response='headers')
+        key = self.cache.get_key(
+            '/accounts/1/lists/303449/custom_fields', ('key', None))
+        self.assertEqual(self.cache.get(key), None)
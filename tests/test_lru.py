@@ -0,0 +1,29 @@
+from unittest import TestCase
+
+from aweber_api.lru import LRUCache
+
+
+class TestLRUCache(TestCase):
+
+    def setUp(self):
+        self.cache = LRUCache(max_size=2)
+        self.cache['a'] = 1
+        self.cache['b'] = 2
+
+    def test_should_get_items(self):
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertEqual(self.cache.get('c'), None)
+        self.assertEqual(self.cache.get('c', 3), 3)
+
+    def test_should_drop_least_recently_used(self):
+        self.cache.get('a')
+        self.cache['c'] = 3
+        self.assertEqual(len(self.cache), 2)
+        self.assertTrue('a' in self.cache)
+        self.assertFalse('b' in self.cache)
+
+    def test_should_replace_items(self):
+        self.cache['a'] = 3
+        self.cache['c'] = 4
+        self.assertEqual(self.cache.get('a'), 3)
+        self.assertFalse('b' in self.cache)
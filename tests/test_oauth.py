@@ -0,0 +1,270 @@
+from unittest import TestCase
+from urlparse import parse_qsl
+import json
+import zlib
+
+import oauth2 as oauth
+
+import aweber_api.oauth
+from aweber_api import (
+    API_BASE,
+    APIException,
+    AWeberUser,
+    NotFound,
+    OAuthAdapter,
+    RateLimited,
+    ServerError,
+    Unauthorized,
+)
+from aweber_api.signature import PreparedHMACSHA1
+from aweber_api.transport import FORM_ENCODED, StubTransport
+
+
+class TestPreparedHMACSHA1(TestCase):
+
+    def setUp(self):
+        self.consumer = oauth.Consumer('key', 'consumer secret')
+        self.token = oauth.Token('token', 'token/secret')
+        self.request = oauth.Request(
+            method='GET',
+            url='https://api.aweber.com/1.0/accounts',
+            parameters={'oauth_nonce': '1234', 'oauth_timestamp': '1'},
+        )
+
+    def test_should_match_stock_signature(self):
+        expected = oauth.SignatureMethod_HMAC_SHA1().sign(
+            self.request, self.consumer, self.token)
+        signature = PreparedHMACSHA1().sign(
+            self.request, self.consumer, self.token)
+        self.assertEqual(signature, expected)
+
+    def test_should_match_stock_signature_without_token(self):
+        expected = oauth.SignatureMethod_HMAC_SHA1().sign(
+            self.request, self.consumer, None)
+        signature = PreparedHMACSHA1().sign(self.request, self.consumer, None)
+        self.assertEqual(signature, expected)
+
+    def test_should_bound_prepared_secrets(self):
+        method = PreparedHMACSHA1()
+        method._prepared.max_size = 2
+        for secret in ('a', 'b', 'c'):
+            method.sign(self.request, oauth.Consumer('key', secret), None)
+        self.assertEqual(len(method._prepared), 2)
+
+    def test_should_normalize_parameters_like_oauth2(self):
+        request = oauth.Request(
+            method='POST',
+            url='https://api.aweber.com/1.0/accounts/1?ws.op=find&a=b%20c',
+            parameters={
+                'oauth_nonce': '1234',
+                'oauth_timestamp': 1,
+                'name': [u'J\xf6e', 'Bob'],
+                'tilde': '~',
+            },
+        )
+        self.assertEqual(
+            PreparedHMACSHA1()._normalized_parameters(request),
+            request.get_normalized_parameters(),
+        )
+
+    def test_should_reuse_prepared_key(self):
+        method = PreparedHMACSHA1()
+        method.sign(self.request, self.consumer, self.token)
+        method.sign(self.request, self.consumer, self.token)
+        self.assertEqual(len(method._prepared), 1)
+
+
+class TestSigningRequests(TestCase):
+
+    def setUp(self):
+        self.transport = StubTransport()
+        self.adapter = OAuthAdapter(
+            'key', 'secret', API_BASE, transport=self.transport)
+        self.adapter.user = AWeberUser()
+        self.adapter.user.access_token = 'token'
+        self.adapter.user.token_secret = 'token secret'
+
+    def verify(self, method, url, parameters):
+        request = oauth.Request(method, url, parameters)
+        signature = request.pop('oauth_signature')
+        expected = oauth.SignatureMethod_HMAC_SHA1().sign(
+            request, self.adapter.consumer, self.adapter._get_token())
+        self.assertEqual(signature, expected)
+
+    def test_should_sign_get_requests_in_url(self):
+        url, body, headers = self.adapter._sign(
+            'GET', API_BASE + '/accounts?ws.size=1', '', {})
+        base_url, query = url.split('?')
+        parameters = dict(parse_qsl(query))
+        self.assertEqual(parameters['oauth_token'], 'token')
+        self.verify('GET', base_url, parameters)
+
+    def test_should_sign_form_encoded_requests_in_body(self):
+        url, body, headers = self.adapter._sign(
+            'POST', API_BASE + '/accounts/1/lists', 'name=list',
+            {'Content-Type': FORM_ENCODED})
+        self.assertEqual(url, API_BASE + '/accounts/1/lists')
+        self.verify('POST', url, dict(parse_qsl(body)))
+
+    def test_should_sign_other_requests_in_header(self):
+        url, body, headers = self.adapter._sign(
+            'PATCH', API_BASE + '/accounts/1', '{"name": "x"}',
+            {'Content-Type': 'application/json'})
+        self.assertEqual(body, '{"name": "x"}')
+        self.assertTrue(headers['Authorization'].startswith('OAuth realm='))
+
+    def test_should_reuse_token(self):
+        token = self.adapter._get_token()
+        self.assertTrue(self.adapter._get_token() is token)
+
+    def test_should_bound_tokens(self):
+        self.adapter._tokens.max_size = 2
+        for token in ('a', 'b', 'c'):
+            self.adapter.user.access_token = token
+            self.adapter._get_token()
+        self.assertEqual(len(self.adapter._tokens), 2)
+
+    def test_should_keep_oauth2_in_module(self):
+        self.adapter._sign('GET', API_BASE + '/accounts', '', {})
+        self.assertTrue(aweber_api.oauth.oauth is oauth)
+
+    def test_should_use_new_token_when_tokens_change(self):
+        token = self.adapter._get_token()
+        self.adapter.user.access_token = 'other token'
+        other = self.adapter._get_token()
+        self.assertFalse(other is token)
+        self.assertEqual(other.key, 'other token')
+
+    def test_should_send_signed_request_with_transport(self):
+        self.transport.add('GET', API_BASE + '/accounts', {'entries': []})
+        self.assertEqual(self.adapter.request('GET', '/accounts'), {
+            'entries': []})
+        self.assertEqual(self.transport.requests[0]['url'],
+                         API_BASE + '/accounts')
+
+
+class TestCompression(TestCase):
+
+    def setUp(self):
+        self.transport = StubTransport()
+        self.adapter = OAuthAdapter(
+            'key', 'secret', API_BASE, transport=self.transport)
+        self.adapter.user = AWeberUser()
+        self.content = json.dumps({'entries': [{'id': 1}] * 100})
+        self.transport.add('PATCH', API_BASE + '/accounts/1', status=209)
+        self.transport.add('POST', API_BASE + '/accounts/1', status=201)
+
+    def add(self, content, encoding):
+        self.transport.add('GET', API_BASE + '/accounts', content,
+                           headers={'content-encoding': encoding})
+
+    def test_should_accept_compressed_responses(self):
+        self.transport.add('GET', API_BASE + '/accounts', '{}')
+        self.adapter.request('GET', '/accounts')
+        self.assertEqual(self.transport.requests[0]['headers'][
+            'Accept-Encoding'], 'gzip, deflate')
+
+    def test_should_decode_gzip(self):
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        self.add(compressor.compress(self.content) + compressor.flush(),
+                 'gzip')
+        self.assertEqual(self.adapter.request('GET', '/accounts'),
+                         json.loads(self.content))
+
+    def test_should_decode_deflate(self):
+        self.add(zlib.compress(self.content), 'deflate')
+        self.assertEqual(self.adapter.request('GET', '/accounts'),
+                         json.loads(self.content))
+
+    def test_should_count_compressed_bytes(self):
+        compressed = zlib.compress(self.content)
+        self.add(compressed, 'deflate')
+        self.adapter.request('GET', '/accounts')
+        self.assertEqual(self.adapter.bytes_received, len(compressed))
+
+    def test_should_not_compress_request_by_default(self):
+        self.adapter.request('PATCH', '/accounts/1', {'name': 'x' * 1000})
+        self.assertEqual(self.transport.requests[0]['body'],
+                         json.dumps({'name': 'x' * 1000}))
+        self.assertEqual(self.adapter.bytes_sent,
+                         len(json.dumps({'name': 'x' * 1000})))
+
+    def test_should_compress_large_requests(self):
+        self.adapter.compress_min_size = 100
+        self.adapter.request('PATCH', '/accounts/1', {'name': 'x' * 1000})
+        request = self.transport.requests[0]
+        self.assertEqual(request['headers']['Content-Encoding'], 'gzip')
+        self.assertEqual(zlib.decompress(request['body'], 16 + zlib.MAX_WBITS),
+                         json.dumps({'name': 'x' * 1000}))
+        self.assertTrue(self.adapter.bytes_sent < 100)
+
+    def test_should_not_compress_form_encoded_requests(self):
+        self.adapter.compress_min_size = 1
+        self.adapter.request('POST', '/accounts/1', {'name': 'x' * 1000})
+        request = self.transport.requests[0]
+        self.assertTrue(not 'Content-Encoding' in request['headers'])
+
+
+class TestErrorResponses(TestCase):
+
+    def setUp(self):
+        self.transport = StubTransport()
+        self.adapter = OAuthAdapter(
+            'key', 'secret', API_BASE, transport=self.transport)
+        self.adapter.user = AWeberUser()
+
+    def get_error(self, status, content, headers=None):
+        self.transport.add(
+            'GET', API_BASE + '/accounts', content, status, headers)
+        try:
+            self.adapter.request('GET', '/accounts')
+        except APIException as error:
+            return error
+        self.fail('No APIException raised')
+
+    def test_should_raise_not_found(self):
+        error = self.get_error(404, {'error': {
+            'type': 'NotFoundError', 'message': 'Not Found'}})
+        self.assertTrue(isinstance(error, NotFound))
+        self.assertEqual(str(error), 'NotFoundError: Not Found')
+        self.assertEqual(error.error_type, 'NotFoundError')
+        self.assertFalse(error.retryable)
+
+    def test_should_raise_rate_limited_for_rate_limit_error(self):
+        error = self.get_error(403, {'error': {
+            'type': 'RateLimitError', 'message': 'Too many requests'}})
+        self.assertTrue(isinstance(error, RateLimited))
+        self.assertTrue(error.retryable)
+
+    def test_should_read_retry_after_seconds(self):
+        error = self.get_error(429, '', {'retry-after': '120'})
+        self.assertTrue(isinstance(error, RateLimited))
+        self.assertEqual(error.retry_after, 120)
+        self.assertEqual(error.headers['retry-after'], '120')
+
+    def test_should_read_retry_after_date(self):
+        error = self.get_error(
+            429, '', {'retry-after': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+        self.assertEqual(error.retry_after, 0)
+
+    def test_should_ignore_invalid_retry_after(self):
+        error = self.get_error(429, '', {'retry-after': 'soon'})
+        self.assertEqual(error.retry_after, None)
+
+    def test_should_raise_unauthorized(self):
+        error = self.get_error(401, {'error': {
+            'type': 'UnauthorizedError', 'message': 'Invalid token'}})
+        self.assertTrue(isinstance(error, Unauthorized))
+
+    def test_should_raise_server_error_for_html_body(self):
+        error = self.get_error(502, '<html><h1>Bad Gateway</h1></html>')
+        self.assertTrue(isinstance(error, ServerError))
+        self.assertEqual(error.status, 502)
+        self.assertEqual(error.error_type, None)
+        self.assertEqual(str(error), '502: <html><h1>Bad Gateway</h1></html>')
+        self.assertTrue(error.retryable)
+
+    def test_should_raise_api_exception_for_other_errors(self):
+        error = self.get_error(400, {'error': {
+            'type': 'WebServiceError', 'message': 'Bad request'}})
+        self.assertEqual(type(error), APIException)
@@ -0,0 +1,95 @@
+from unittest import TestCase
+
+from aweber_api.page_cache import PageCache
+
+
+def page(start, size):
+    return [{'id': offset} for offset in range(start, start + size)]
+
+
+class TestPageCache(TestCase):
+
+    def setUp(self):
+        self.cache = PageCache()
+        self.cache.add_page(0, page(0, 10))
+
+    def test_should_get_entry_data_by_offset(self):
+        self.assertEqual(self.cache.get(3), {'id': 3})
+
+    def test_should_contain_cached_offsets(self):
+        self.assertTrue(9 in self.cache)
+        self.assertFalse(10 in self.cache)
+
+    def test_should_count_hits_and_misses(self):
+        self.cache.get_entry(3)
+        self.cache.get_entry(30)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_should_keep_entries(self):
+        self.cache.set_entry(3, 'entry')
+        self.assertEqual(self.cache.get_entry(3), 'entry')
+
+    def test_should_ignore_empty_pages(self):
+        self.cache.add_page(None, [])
+        self.assertEqual(len(self.cache), 1)
+
+
+class TestEvictingPages(TestCase):
+
+    def setUp(self):
+        self.cache = PageCache(max_pages=2)
+        self.cache.add_page(0, page(0, 10))
+        self.cache.set_entry(0, 'entry')
+        self.cache.add_page(10, page(10, 10))
+        self.cache.get(0)
+        self.cache.add_page(20, page(20, 10))
+
+    def test_should_keep_max_pages(self):
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.evictions, 1)
+
+    def test_should_evict_least_recently_used_page(self):
+        self.assertFalse(15 in self.cache)
+        self.assertTrue(5 in self.cache)
+        self.assertTrue(25 in self.cache)
+
+    def test_should_evict_least_recently_used_when_lowering_bound(self):
+        self.cache.get(25)
+        self.cache.set_limits(max_pages=1)
+        self.assertEqual(len(self.cache), 1)
+        self.assertTrue(25 in self.cache)
+
+    def test_should_evict_entries_with_page(self):
+        self.cache.add_page(30, page(30, 10))
+        self.assertEqual(self.cache.get_entry(0), None)
+
+
+class TestEvictingPagesBySize(TestCase):
+
+    def test_should_keep_pages_within_max_bytes(self):
+        cache = PageCache(max_bytes=1)
+        cache.add_page(0, page(0, 10))
+        cache.add_page(10, page(10, 10))
+        self.assertEqual(len(cache), 1)
+        self.assertTrue(15 in cache)
+        self.assertTrue(cache.bytes > 0)
+
+    def test_should_track_bytes(self):
+        cache = PageCache(max_bytes=10 ** 9)
+        cache.add_page(0, page(0, 10))
+        size = cache.bytes
+        cache.add_page(10, page(10, 10))
+        self.assertEqual(cache.bytes, 2 * size)
+
+    def test_should_size_cached_pages_when_setting_max_bytes(self):
+        cache = PageCache()
+        cache.add_page(0, page(0, 10))
+        cache.add_page(10, page(10, 10))
+        self.assertEqual(cache.bytes, 0)
+        cache.set_limits(max_bytes=10 ** 9)
+        size = cache.bytes
+        self.assertTrue(size > 0)
+        cache.set_limits(max_bytes=size - 1)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.evictions, 1)
@@ -0,0 +1,90 @@
+from unittest import TestCase
+
+from mock import Mock
+
+from aweber_api import AWeberAPI, AWeberCollection, AWeberEntry
+from aweber_api.base import API_BASE
+from mock_adapter import MockAdapter
+
+
+class QueryTestCase(TestCase):
+
+    def setUp(self):
+        self.aweber = AWeberAPI('1', '2')
+        self.aweber.adapter = MockAdapter()
+        self.subscribers = self.aweber.load_from_url(
+            '/accounts/1/lists/303449/subscribers')
+        self.aweber.adapter.requests = []
+
+
+class TestBuildingQuery(QueryTestCase):
+
+    def test_should_not_request_anything(self):
+        self.subscribers.query().where(email='joe@example.com').fields('id')
+        self.assertEqual(self.aweber.adapter.requests, [])
+
+    def test_should_build_find_url(self):
+        query = self.subscribers.query().where(email='joe@example.com')
+        self.assertEqual(
+            query.url, '/accounts/1/lists/303449/subscribers'
+            '?ws.op=find&email=joe%40example.com')
+
+    def test_should_compose_filters(self):
+        query = self.subscribers.query().where(status='subscribed')
+        composed = query.where(email='joe@example.com')
+        self.assertEqual(query._filters, {'status': 'subscribed'})
+        self.assertEqual(composed._filters, {
+            'status': 'subscribed', 'email': 'joe@example.com'})
+
+
+class TestRunningQuery(QueryTestCase):
+
+    def setUp(self):
+        super(TestRunningQuery, self).setUp()
+        self.query = self.subscribers.query().where(email='joe@example.com')
+
+    def test_should_iterate_entries(self):
+        subscribers = list(self.query)
+        self.assertEqual(len(subscribers), 1)
+        self.assertTrue(isinstance(subscribers[0], AWeberEntry))
+        self.assertEqual(subscribers[0].id, 50205517)
+
+    def test_should_not_request_total_size_when_iterating(self):
+        list(self.query)
+        self.assertEqual(len(self.aweber.adapter.requests), 1)
+
+    def test_should_only_request_total_size_on_count(self):
+        self.assertEqual(self.query.count(), 1)
+        self.assertEqual(len(self.aweber.adapter.requests), 1)
+        self.assertTrue(
+            'ws.show=total_size' in self.aweber.adapter.requests[0]['url'])
+
+    def test_should_project_fields(self):
+        subscribers = list(self.query.fields('id', 'city'))
+        self.assertEqual(subscribers, [{'id': 50205517, 'city': 'Fairport'}])
+
+    def test_should_request_page_size(self):
+        list(self.query.page_size(50))
+        self.assertEqual(self.aweber.adapter.requests[0]['data'],
+                         {'ws.size': 50})
+
+
+class TestFollowingQueryPages(TestCase):
+
+    def setUp(self):
+        self.adapter = Mock()
+        self.adapter.request.side_effect = [
+            {'start': 0, 'entries': [{'id': 1}, {'id': 2}],
+             'next_collection_link': '{0}/accounts/1/lists?ws.op=find'
+                                     '&ws.start=2&ws.size=2'.format(API_BASE)},
+            {'start': 2, 'entries': [{'id': 3}]},
+        ]
+        self.collection = AWeberCollection('/accounts/1/lists', {
+            'total_size': 0, 'start': None, 'entries': [],
+        }, self.adapter)
+
+    def test_should_follow_next_collection_link(self):
+        results = list(self.collection.query().fields('id'))
+        self.assertEqual(results, [{'id': 1}, {'id': 2}, {'id': 3}])
+        self.assertEqual(self.adapter.request.call_args[0], (
+            'GET', '/accounts/1/lists?ws.op=find&ws.start=2&ws.size=2'))
@@ -0,0 +1,103 @@
+import time
+from unittest import TestCase
+
+from aweber_api import AWeberUser, APIException, OAuthAdapter
+from aweber_api.transport import StubTransport, ThreadedTransport
+from stub_server import StubServer
+
+
+class TestRequestingManyFromServer(TestCase):
+
+    def setUp(self):
+        self.server = StubServer(latency=0.1)
+        self.server.start()
+        self.adapter = OAuthAdapter('key', 'secret', self.server.url)
+        self.adapter.user = AWeberUser()
+        self.adapter.max_connections = 4
+
+    def tearDown(self):
+        self.adapter.close()
+        self.server.stop()
+
+    def test_should_return_results_in_order(self):
+        results = self.adapter.request_many(
+            [('GET', '/accounts/{0}'.format(index)) for index in range(8)])
+        self.assertEqual([result['path'] for result in results],
+                         ['/accounts/{0}'.format(index) for index in range(8)])
+
+    def test_should_overlap_round_trips(self):
+        started = time.time()
+        self.adapter.request_many([('GET', '/accounts')] * 8)
+        self.assertTrue(time.time() - started < 0.5)
+
+    def test_should_reuse_connections(self):
+        self.adapter.request_many([('GET', '/accounts')] * 8)
+        self.adapter.request_many([('GET', '/accounts')] * 8)
+        self.assertEqual(len(self.server.requests), 16)
+        self.assertTrue(len(self.server.connections) <= 4)
+
+
+class TestSubmittingManyToServer(TestCase):
+
+    def setUp(self):
+        self.server = StubServer(latency=0.1)
+        self.server.start()
+        self.transport = ThreadedTransport(workers=4)
+        self.adapter = OAuthAdapter(
+            'key', 'secret', self.server.url, transport=self.transport)
+        self.adapter.user = AWeberUser()
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.stop()
+
+    def test_should_return_results_in_order(self):
+        results = self.adapter.request_many(
+            [('GET', '/accounts/{0}'.format(index)) for index in range(8)])
+        self.assertEqual([result['path'] for result in results],
+                         ['/accounts/{0}'.format(index) for index in range(8)])
+
+    def test_should_overlap_round_trips(self):
+        started = time.time()
+        self.adapter.request_many([('GET', '/accounts')] * 8)
+        self.assertTrue(time.time() - started < 0.5)
+        self.assertEqual(self.adapter._pool, None)
+
+    def test_should_sign_submitted_requests(self):
+        self.adapter.request_many([('GET', '/accounts')] * 2)
+        for method, path in self.server.requests:
+            self.assertTrue('oauth_signature=' in path)
+
+
+class TestRequestingManyWithErrors(TestCase):
+
+    def setUp(self):
+        self.transport = StubTransport()
+        self.transport.add('GET', 'https://api/accounts', {'id': 1})
+        self.adapter = OAuthAdapter(
+            'key', 'secret', 'https://api', transport=self.transport)
+        self.adapter.user = AWeberUser()
+
+    def tearDown(self):
+        self.adapter.close()
+
+    def test_should_raise_errors(self):
+        self.assertRaises(APIException, self.adapter.request_many,
+                          [('GET', '/accounts'), ('GET', '/lists')])
+
+    def test_should_return_errors(self):
+        results = self.adapter.request_many(
+            [('GET', '/accounts'), ('GET', '/lists', {}, 'body')],
+            raise_errors=False)
+        self.assertEqual(results[0], {'id': 1})
+        self.assertTrue(isinstance(results[1], APIException))
+
+
+class TestSubmittingManyWithErrors(TestRequestingManyWithErrors):
+
+    def setUp(self):
+        super(TestSubmittingManyWithErrors, self).setUp()
+        self.adapter.transport = ThreadedTransport(self.transport)
+
+    def tearDown(self):
+        self.adapter.transport.close()
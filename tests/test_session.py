@@ -0,0 +1,65 @@
+import gc
+from unittest import TestCase
+
+from aweber_api import AWeberAPI
+from mock_adapter import MockAdapter
+
+
+class SessionTestCase(TestCase):
+
+    def setUp(self):
+        self.aweber = AWeberAPI('1', '2')
+        self.aweber.adapter = MockAdapter()
+        self.session = self.aweber.adapter.session
+        self.subscriber = self.aweber.load_from_url(
+            '/accounts/1/lists/303449/subscribers/1')
+
+
+class TestSession(SessionTestCase):
+
+    def test_should_contain_loaded_entries(self):
+        self.assertTrue(self.session.get(self.subscriber.url)
+                        is self.subscriber)
+
+    def test_should_key_entries_by_self_link(self):
+        self.assertTrue(self.session.get(self.subscriber.self_link)
+                        is self.subscriber)
+
+    def test_should_not_keep_entries_alive(self):
+        url = self.subscriber.url
+        del self.subscriber
+        gc.collect()
+        self.assertEqual(self.session.get(url), None)
+
+    def test_should_return_same_instance_on_repeat_lookup(self):
+        entry = self.aweber.load_from_url(
+            '/accounts/1/lists/303449/subscribers/1')
+        self.assertTrue(entry is self.subscriber)
+
+
+class TestRefreshingEntries(SessionTestCase):
+
+    def test_should_update_entry_with_fresher_data(self):
+        self.subscriber.name
+        data = dict(self.subscriber._data, name='Bob', http_etag='"new"')
+        self.subscriber._refresh(data)
+        self.assertEqual(self.subscriber.name, 'Bob')
+
+    def test_should_ignore_data_with_same_etag(self):
+        data = dict(self.subscriber._data, name='Bob')
+        self.subscriber._refresh(data)
+        self.assertEqual(self.subscriber.name, 'Joe Jones')
+
+    def test_should_keep_unsaved_changes(self):
+        self.subscriber.name = 'Gary Oldman'
+        self.subscriber.custom_fields['Color'] = 'Red'
+        data = dict(self.subscriber._data, http_etag='"new"',
+                    custom_fields={'Color': 'blue', 'test': 'yes'})
+        self.subscriber._refresh(data)
+
+        self.assertEqual(self.subscriber.name, 'Gary Oldman')
+        self.assertEqual(self.subscriber.custom_fields['test'], 'yes')
+        self.assertEqual(self.subscriber._get_diff(), {
+            'name': 'Gary Oldman',
+            'custom_fields': {'Color': 'Red'},
+        })
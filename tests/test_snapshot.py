@@ -0,0 +1,115 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from mock import patch
+
+from aweber_api import API_BASE, AWeberEntry, AWeberUser, OAuthAdapter
+from aweber_api.snapshot import (
+    Change,
+    diff_snapshots,
+    load_changed,
+    take_snapshot,
+)
+from aweber_api.transport import StubTransport
+
+LIST = '/accounts/1/lists/2'
+
+
+def subscriber(id, etag):
+    url = '{0}/subscribers/{1}'.format(LIST, id)
+    return {
+        'id': id, 'http_etag': etag, 'self_link': API_BASE + url,
+        'resource_type_link': API_BASE + '/#subscriber',
+    }
+
+
+class SnapshotTestCase(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.transport = StubTransport()
+        self.adapter = OAuthAdapter(
+            'key', 'secret', API_BASE, transport=self.transport)
+        self.adapter.user = AWeberUser()
+        self.list_ = AWeberEntry(LIST, {
+            'self_link': API_BASE + LIST,
+            'resource_type_link': API_BASE + '/#list',
+        }, self.adapter)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def snapshot(self, name, subscribers, **kwargs):
+        url = API_BASE + LIST + '/subscribers'
+        self.transport.add('GET', url + '?ws.size=2', {
+            'entries': subscribers[:2],
+            'next_collection_link': url + '?ws.start=2&ws.size=2'})
+        self.transport.add('GET', url + '?ws.start=2&ws.size=2', {
+            'entries': subscribers[2:]})
+        path = os.path.join(self.directory, name)
+        take_snapshot(self.list_, path, page_size=2, **kwargs)
+        return path
+
+
+class TestTakingSnapshot(SnapshotTestCase):
+
+    def test_should_write_sorted_fingerprints(self):
+        path = self.snapshot('old', [
+            subscriber(3, '"c"'), subscriber(1, '"a"'), subscriber(2, '"b"')])
+        self.assertEqual(open(path).read(), '1\t"a"\n2\t"b"\n3\t"c"\n')
+
+    def test_should_merge_sorted_chunks(self):
+        path = self.snapshot('old', [
+            subscriber(3, '"c"'), subscriber(1, '"a"'), subscriber(2, '"b"')],
+            chunk_size=1)
+        self.assertEqual(open(path).read(), '1\t"a"\n2\t"b"\n3\t"c"\n')
+        self.assertEqual(sorted(os.listdir(self.directory)), ['old'])
+
+
+    def test_should_write_subscribers_seen_twice_once(self):
+        path = self.snapshot('old', [
+            subscriber(1, '"a"'), subscriber(2, '"b"'),
+            subscriber(2, '"b"'), subscriber(3, '"c"')], chunk_size=1)
+        self.assertEqual(open(path).read(), '1\t"a"\n2\t"b"\n3\t"c"\n')
+
+    def test_should_remove_temporary_file_on_error(self):
+        def merge(*iterables):
+            yield (1, '"a"')
+            raise IOError('No space left on device')
+
+        with patch('aweber_api.snapshot.heapq.merge', merge):
+            self.assertRaises(IOError, self.snapshot, 'old', [
+                subscriber(1, '"a"'), subscriber(2, '"b"')])
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+class TestDiffingSnapshots(SnapshotTestCase):
+
+    def setUp(self):
+        super(TestDiffingSnapshots, self).setUp()
+        old = self.snapshot('old', [
+            subscriber(1, '"a"'), subscriber(2, '"b"'), subscriber(3, '"c"')])
+        new = self.snapshot('new', [
+            subscriber(2, '"b"'), subscriber(3, '"d"'), subscriber(4, '"e"')])
+        self.changes = list(diff_snapshots(old, new))
+
+    def test_should_yield_changes(self):
+        self.assertEqual(self.changes, [
+            Change('removed', 1, '"a"'),
+            Change('changed', 3, '"d"'),
+            Change('added', 4, '"e"'),
+        ])
+
+    def test_should_only_load_changed_subscribers(self):
+        self.transport.add('GET', API_BASE + LIST + '/subscribers/3',
+                           subscriber(3, '"d"'))
+        self.transport.add('GET', API_BASE + LIST + '/subscribers/4',
+                           subscriber(4, '"e"'))
+        del self.transport.requests[:]
+        loaded = sorted(
+            (change.id, entry.http_etag)
+            for change, entry in load_changed(self.list_, self.changes))
+        self.assertEqual(loaded, [(3, '"d"'), (4, '"e"')])
+        self.assertEqual(len(self.transport.requests), 2)
@@ -0,0 +1,142 @@
+import json
+from unittest import TestCase
+from urlparse import parse_qs, urlparse
+
+from mock import patch
+
+from aweber_api import API_BASE, AWeberUser, OAuthAdapter
+from aweber_api.stats import HyperLogLog, StatsAggregator, aggregate
+from aweber_api.transport import StubTransport
+
+OPENS = '/accounts/1/lists/2/campaigns/b3/messages/4/opens'
+CLICKS = '/accounts/1/lists/2/campaigns/b3/links/5/clicks'
+
+
+def event(time, subscriber):
+    return {
+        'event_time': time,
+        'subscriber_link': '{0}/accounts/1/lists/2/subscribers/{1}'.format(
+            API_BASE, subscriber),
+    }
+
+
+class TestHyperLogLog(TestCase):
+
+    def test_should_count_few_values_exactly(self):
+        counter = HyperLogLog()
+        for value in ['a', 'b', 'c', 'a']:
+            counter.add(value)
+        self.assertEqual(len(counter), 3)
+
+    def test_should_approximate_many_values(self):
+        counter = HyperLogLog()
+        for value in xrange(20000):
+            counter.add(str(value))
+        self.assertTrue(abs(len(counter) - 20000) < 20000 * 0.05)
+
+    def test_should_merge_counters(self):
+        counter, other = HyperLogLog(), HyperLogLog()
+        counter.add('a')
+        other.add('b')
+        counter.merge(other)
+        self.assertEqual(len(counter), 2)
+
+    @patch('aweber_api.stats.sha1')
+    def test_should_rank_all_zero_hash_past_remaining_bits(self, sha1):
+        sha1.return_value.hexdigest.return_value = '0' * 40
+        counter = HyperLogLog(precision=4)
+        counter.add('a')
+        self.assertEqual(counter.registers[0], 61)
+
+
+class TestStatsAggregator(TestCase):
+
+    def setUp(self):
+        self.stats = StatsAggregator(use_numpy=False)
+        self.stats.add_page(API_BASE + OPENS, [
+            event('2014-09-06T18:55:00-04:00', 1),
+            event('2014-09-06T18:59:00-04:00', 2),
+            event('2014-09-06T19:01:00-04:00', 1),
+        ])
+
+    def test_should_count_events(self):
+        self.assertEqual(self.stats.total, 3)
+
+    def test_should_count_events_by_parent(self):
+        self.assertEqual(self.stats.by_parent, {
+            '/accounts/1/lists/2/campaigns/b3/messages/4': 3})
+
+    def test_should_count_events_by_hour(self):
+        self.assertEqual(self.stats.by_hour, {
+            '2014-09-06T18': 2, '2014-09-06T19': 1})
+
+    def test_should_count_unique_subscribers(self):
+        self.assertEqual(self.stats.unique_subscribers, 2)
+
+
+class TestAggregatingCollections(TestCase):
+
+    def setUp(self):
+        self.transport = StubTransport()
+        self.adapter = OAuthAdapter(
+            'key', 'secret', API_BASE, transport=self.transport)
+        self.adapter.user = AWeberUser()
+        opens = [event('2014-09-06T18:00:00', index) for index in range(5)]
+        for start in (0, 2, 4):
+            self.transport.add(
+                'GET', '{0}{1}?ws.start={2}&ws.size=2'.format(
+                    API_BASE, OPENS, start),
+                {'total_size': 5, 'entries': opens[start:start + 2]})
+        self.transport.add(
+            'GET', API_BASE + CLICKS + '?ws.start=0&ws.size=2',
+            {'entries': [event('2014-09-06T19:00:00', 1)],
+             'next_collection_link': API_BASE + CLICKS + '?ws.start=1'})
+        self.transport.add(
+            'GET', API_BASE + CLICKS + '?ws.start=1',
+            {'entries': [event('2014-09-06T19:00:00', 7)]})
+
+        self.stats = aggregate(
+            self.adapter, [OPENS, CLICKS], concurrency=3, page_size=2)
+
+    def test_should_read_all_pages(self):
+        self.assertEqual(self.stats.total, 7)
+        self.assertEqual(len(self.transport.requests), 5)
+
+    def test_should_count_by_parent(self):
+        self.assertEqual(self.stats.by_parent, {
+            '/accounts/1/lists/2/campaigns/b3/messages/4': 5,
+            '/accounts/1/lists/2/campaigns/b3/links/5': 2,
+        })
+
+    def test_should_count_unique_subscribers(self):
+        self.assertEqual(self.stats.unique_subscribers, 6)
+
+
+class TestAggregatingShortPages(TestCase):
+
+    def setUp(self):
+        self.transport = StubTransport(self.handler)
+        self.adapter = OAuthAdapter(
+            'key', 'secret', API_BASE, transport=self.transport)
+        self.adapter.user = AWeberUser()
+        self.max_size = 100
+
+    def handler(self, method, url, body, headers):
+        query = parse_qs(urlparse(url).query)
+        start = int(query['ws.start'][0])
+        size = min(int(query['ws.size'][0]), self.max_size, 250 - start)
+        return {'status': '200'}, json.dumps({
+            'total_size': 250,
+            'entries': [event('2014-09-06T18:00:00', index)
+                        for index in range(start, start + size)]})
+
+    def test_should_cap_page_size(self):
+        stats = aggregate(self.adapter, [OPENS], page_size=200)
+        self.assertEqual(stats.total, 250)
+        self.assertEqual(len(self.transport.requests), 3)
+
+    def test_should_step_by_size_of_first_page(self):
+        self.max_size = 40
+        stats = aggregate(self.adapter, [OPENS], page_size=100)
+        self.assertEqual(stats.total, 250)
+        self.assertEqual(len(self.transport.requests), 7)
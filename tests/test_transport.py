@@ -0,0 +1,187 @@
+import json
+import socket
+import threading
+from unittest import TestCase
+
+from nose.plugins.skip import SkipTest
+
+from aweber_api import AWeberUser, OAuthAdapter
+from aweber_api.transport import (
+    FORM_ENCODED,
+    Httplib2Transport,
+    StubTransport,
+    ThreadedTransport,
+    Urllib3Transport,
+    normalize_url,
+    strip_oauth_params,
+)
+from stub_server import StubServer
+
+
+class TestStubTransport(TestCase):
+
+    def setUp(self):
+        self.transport = StubTransport()
+        self.transport.add('GET', 'https://api/lists?b=2&a=1', {'id': 1})
+
+    def test_should_answer_added_requests(self):
+        resp, content = self.transport.request(
+            'https://api/lists?a=1&b=2&oauth_nonce=3')
+        self.assertEqual(resp['status'], '200')
+        self.assertEqual(content, '{"id": 1}')
+
+    def test_should_answer_unknown_requests_with_not_found(self):
+        resp, content = self.transport.request('https://api/lists')
+        self.assertEqual(resp['status'], '404')
+
+    def test_should_record_requests_without_oauth_params(self):
+        self.transport.request(
+            'https://api/lists', 'POST', 'name=x&oauth_token=1',
+            {'Content-Type': FORM_ENCODED})
+        self.assertEqual(self.transport.requests[0]['url'],
+                         'https://api/lists')
+        self.assertEqual(self.transport.requests[0]['body'], 'name=x')
+
+    def test_should_use_handler(self):
+        transport = StubTransport(
+            lambda method, url, body, headers: ({'status': '201'}, url))
+        resp, content = transport.request('https://api/lists?oauth_nonce=1')
+        self.assertEqual(content, 'https://api/lists')
+
+
+class TestThreadedTransport(TestCase):
+
+    def setUp(self):
+        self.threads = []
+
+        def handler(method, url, body, headers):
+            self.threads.append(threading.current_thread())
+            return {'status': '200'}, url
+
+        self.transport = ThreadedTransport(StubTransport(handler), workers=2)
+
+    def tearDown(self):
+        self.transport.close()
+
+    def test_should_send_requests_from_workers(self):
+        resp, content = self.transport.request('https://api/lists')
+        self.assertEqual(content, 'https://api/lists')
+        self.assertTrue(self.threads[0] is not threading.current_thread())
+
+    def test_should_submit_requests(self):
+        results = [self.transport.submit('https://api/{0}'.format(index))
+                   for index in range(4)]
+        self.assertEqual([result.get()[1] for result in results],
+                         ['https://api/{0}'.format(index)
+                          for index in range(4)])
+
+
+class TestHttplib2Transport(TestCase):
+
+    def test_should_use_one_http_per_thread(self):
+        transport = Httplib2Transport(timeout=5)
+        http = transport._get_http()
+        others = []
+        thread = threading.Thread(
+            target=lambda: others.append(transport._get_http()))
+        thread.start()
+        thread.join()
+        self.assertTrue(transport._get_http() is http)
+        self.assertTrue(others[0] is not http)
+        self.assertEqual(http.timeout, 5)
+
+
+class TestCountingBytesAgainstServer(TestCase):
+
+    def setUp(self):
+        self.server = StubServer(padding=10000)
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_should_return_size_read_from_socket(self):
+        resp, content = Httplib2Transport().request(
+            self.server.url + '/accounts',
+            headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(json.loads(content)['path'], '/accounts')
+        self.assertEqual(resp['-content-length'],
+                         str(self.server.bytes_sent))
+
+    def test_should_count_compressed_size_in_adapter(self):
+        adapter = OAuthAdapter('key', 'secret', self.server.url)
+        adapter.user = AWeberUser()
+        adapter.request('GET', '/accounts')
+        adapter.request('GET', '/accounts/1')
+        self.assertEqual(adapter.bytes_received, self.server.bytes_sent)
+        self.assertTrue(adapter.bytes_received < 1000)
+
+
+class TestUrllib3TransportAgainstServer(TestCase):
+
+    def setUp(self):
+        try:
+            import urllib3
+        except ImportError:
+            raise SkipTest('urllib3 is not installed')
+        self.server = StubServer()
+        self.server.start()
+        self.transport = Urllib3Transport(maxsize=2)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_should_return_status_and_content(self):
+        resp, content = self.transport.request(
+            self.server.url + '/accounts', 'POST', 'name=x',
+            {'Content-Type': FORM_ENCODED})
+        self.assertEqual(resp['status'], '200')
+        self.assertEqual(resp['content-type'], 'application/json')
+        self.assertEqual(json.loads(content), {'path': '/accounts'})
+        self.assertEqual(self.server.requests, [('POST', '/accounts')])
+
+    def test_should_reuse_connections_across_threads(self):
+        def request():
+            for index in range(4):
+                self.transport.request(self.server.url + '/accounts')
+
+        threads = [threading.Thread(target=request) for index in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.server.requests), 8)
+        self.assertTrue(len(self.server.connections) <= 2)
+
+    def test_should_leave_compressed_content_to_adapter(self):
+        self.server.padding = 10000
+        adapter = OAuthAdapter('key', 'secret', self.server.url,
+                               transport=self.transport)
+        adapter.user = AWeberUser()
+        self.assertEqual(adapter.request('GET', '/accounts')['path'],
+                         '/accounts')
+        self.assertEqual(adapter.bytes_received, self.server.bytes_sent)
+
+    def test_should_raise_socket_timeout(self):
+        self.server.latency = 0.5
+        self.assertRaises(socket.timeout, self.transport.request,
+                          self.server.url + '/accounts', timeout=0.1)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_should_raise_socket_timeout_after_retries(self):
+        self.server.latency = 0.5
+        transport = Urllib3Transport(retries=1)
+        self.assertRaises(socket.timeout, transport.request,
+                          self.server.url + '/accounts', timeout=0.1)
+
+
+class TestUrls(TestCase):
+
+    def test_should_strip_oauth_params(self):
+        self.assertEqual(
+            strip_oauth_params('https://api/a?x=1&oauth_signature=2'),
+            'https://api/a?x=1')
+
+    def test_should_sort_params(self):
+        self.assertEqual(normalize_url('https://api/a?b=1&a=2'),
+                         'https://api/a?a=2&b=1')
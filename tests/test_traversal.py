@@ -0,0 +1,115 @@
+from unittest import TestCase
+
+from aweber_api import AWeberEntry
+from aweber_api.base import API_BASE
+from aweber_api.session import Session
+from aweber_api.traversal import traverse
+
+
+def entry_data(url, type):
+    return {
+        'id': url.rsplit('/', 1)[-1],
+        'self_link': API_BASE + url,
+        'resource_type_link': '{0}/#{1}'.format(API_BASE, type),
+    }
+
+
+def collection_data(*entries, **kwargs):
+    data = {'start': 0, 'total_size': len(entries), 'entries': list(entries)}
+    data.update(kwargs)
+    return data
+
+
+class TreeAdapter(object):
+    """Returns collections of a small account, and an empty one for
+    any other collection."""
+
+    def __init__(self):
+        self.session = Session()
+        self.requests = []
+        self.responses = {
+            '/accounts/1/lists': collection_data(
+                entry_data('/accounts/1/lists/1', 'list'),
+                next_collection_link=API_BASE + '/accounts/1/lists?page=2'),
+            '/accounts/1/lists?page=2': collection_data(
+                entry_data('/accounts/1/lists/2', 'list')),
+            '/accounts/1/lists/1/subscribers': collection_data(
+                entry_data('/accounts/1/lists/1/subscribers/1', 'subscriber'),
+                entry_data('/accounts/1/lists/1/subscribers/2', 'subscriber')),
+            '/accounts/1/lists/2/subscribers': collection_data(
+                entry_data('/accounts/1/lists/2/subscribers/3', 'subscriber')),
+        }
+
+    def request(self, method, url, data={}, response='body'):
+        self.requests.append(url)
+        return self.responses.get(url, collection_data())
+
+
+class TestTraversal(TestCase):
+
+    def setUp(self):
+        self.adapter = TreeAdapter()
+        self.account = AWeberEntry(
+            '/accounts/1', entry_data('/accounts/1', 'account'), self.adapter)
+
+    def urls(self, entries):
+        return [entry.url for entry in entries]
+
+    def test_should_walk_breadth_first(self):
+        entries = list(self.account.traverse(concurrency=1))
+        self.assertEqual([entry.type for entry in entries],
+                         ['list', 'list', 'subscriber', 'subscriber',
+                          'subscriber'])
+
+    def test_should_walk_concurrently(self):
+        entries = list(traverse(self.account, concurrency=4))
+        self.assertEqual(sorted(self.urls(entries)), [
+            '/accounts/1/lists/1',
+            '/accounts/1/lists/1/subscribers/1',
+            '/accounts/1/lists/1/subscribers/2',
+            '/accounts/1/lists/2',
+            '/accounts/1/lists/2/subscribers/3',
+        ])
+
+    def test_should_set_parents(self):
+        entries = list(traverse(self.account, concurrency=1))
+        self.assertTrue(entries[0].get_parent_entry() is self.account)
+        self.assertTrue(entries[-1].get_parent_entry() is entries[1])
+
+    def test_should_limit_depth(self):
+        entries = list(traverse(self.account, max_depth=1))
+        self.assertEqual(self.urls(entries),
+                         ['/accounts/1/lists/1', '/accounts/1/lists/2'])
+        self.assertEqual(sorted(self.adapter.requests), [
+            '/accounts/1/integrations', '/accounts/1/lists',
+            '/accounts/1/lists?page=2'])
+
+    def test_should_yield_entries_of_each_page_as_it_arrives(self):
+        entries = traverse(self.account, concurrency=1)
+        self.assertEqual(next(entries).url, '/accounts/1/lists/1')
+        self.assertEqual(self.adapter.requests, ['/accounts/1/lists'])
+
+    def test_should_raise_errors_of_requests(self):
+        def request(method, url, data={}, response='body'):
+            raise ValueError(url)
+
+        self.adapter.request = request
+        self.assertRaises(ValueError, list, traverse(self.account))
+
+    def test_should_only_load_included_collections(self):
+        list(traverse(self.account, include=['lists', 'subscribers']))
+        self.assertEqual(sorted(self.adapter.requests), [
+            '/accounts/1/lists',
+            '/accounts/1/lists/1/subscribers',
+            '/accounts/1/lists/2/subscribers',
+            '/accounts/1/lists?page=2',
+        ])
+
+    def test_should_not_load_excluded_collections(self):
+        entries = list(traverse(
+            self.account, exclude=['integrations', 'subscribers']))
+        self.assertEqual(len(entries), 2)
+        self.assertTrue(
+            not '/accounts/1/integrations' in self.adapter.requests)
+        self.assertTrue(
+            not '/accounts/1/lists/1/subscribers' in self.adapter.requests)
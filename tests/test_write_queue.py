@@ -0,0 +1,183 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+from unittest import TestCase
+from urlparse import parse_qs
+
+from aweber_api import API_BASE, AWeberCollection, AWeberEntry, AWeberUser
+from aweber_api import OAuthAdapter
+from aweber_api.transport import StubTransport
+from aweber_api.write_queue import WriteQueue
+
+
+class WriteQueueTestCase(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'writes.db')
+        self.statuses = []
+        self.transport = StubTransport(self.respond)
+        self.adapter = OAuthAdapter(
+            'key', 'secret', API_BASE, transport=self.transport)
+        self.adapter.user = AWeberUser()
+        self.queue = WriteQueue(self.adapter, self.path, backoff=0)
+        self.subscriber = self.entry('/accounts/1/lists/2/subscribers/3')
+        self.list_ = self.entry('/accounts/1/lists/4', 'list')
+
+    def tearDown(self):
+        self.queue.stop(flush=False)
+        shutil.rmtree(self.directory)
+
+    def entry(self, url, type='subscriber'):
+        return AWeberEntry(url, {
+            'self_link': API_BASE + url, 'name': 'Joe',
+            'resource_type_link': '{0}/#{1}'.format(API_BASE, type),
+        }, self.adapter)
+
+    def respond(self, method, url, body, headers):
+        status = 200
+        if self.statuses:
+            status = self.statuses.pop(0)
+        return {'status': str(status)}, json.dumps({'error': {
+            'type': 'Error', 'message': 'status {0}'.format(status)}})
+
+    def sent(self):
+        return [(request['method'], request['url'].replace(API_BASE, ''))
+                for request in self.transport.requests]
+
+
+class TestQueueingWrites(WriteQueueTestCase):
+
+    def test_should_not_send_writes_when_queued(self):
+        self.queue.delete(self.subscriber)
+        self.assertEqual(self.transport.requests, [])
+        self.assertEqual(len(self.queue), 1)
+
+    def test_should_keep_writes_across_queues(self):
+        self.queue.delete(self.subscriber)
+        queue = WriteQueue(self.adapter, self.path)
+        self.assertEqual(len(queue), 1)
+        self.assertEqual(queue.flush(), 1)
+        self.assertEqual(len(self.queue), 0)
+
+    def test_should_queue_changes_of_entry(self):
+        self.subscriber.name = 'Bob'
+        self.queue.save(self.subscriber)
+        self.assertEqual(self.subscriber._diff, {'name': 'Bob'})
+        self.queue.flush()
+        self.assertEqual(self.transport.requests[0]['method'], 'PATCH')
+        self.assertEqual(json.loads(self.transport.requests[0]['body']),
+                         {'name': 'Bob'})
+        self.assertEqual(self.subscriber._diff, {})
+
+    def test_should_keep_changes_of_entry_until_sent(self):
+        self.statuses = [400]
+        self.subscriber.name = 'Bob'
+        self.queue.save(self.subscriber)
+        self.queue.flush()
+        self.assertEqual(self.subscriber._diff, {'name': 'Bob'})
+
+    def test_should_keep_changes_made_after_saving(self):
+        self.subscriber.name = 'Bob'
+        self.queue.save(self.subscriber)
+        self.subscriber.name = 'Jim'
+        self.queue.flush()
+        self.assertEqual(self.subscriber._diff, {'name': 'Jim'})
+
+    def test_should_queue_creates(self):
+        collection = AWeberCollection(
+            '/accounts/1/lists/4/custom_fields',
+            {'entries': [], 'start': 0, 'total_size': 0}, self.adapter)
+        self.queue.create(collection, name=u'Color')
+        self.queue.flush()
+        self.assertEqual(parse_qs(self.transport.requests[0]['body']), {
+            'ws.op': ['create'], 'name': ['Color']})
+
+    def test_should_queue_moves(self):
+        self.queue.move(self.subscriber, self.list_)
+        self.queue.flush()
+        self.assertEqual(self.sent(), [
+            ('POST', '/accounts/1/lists/2/subscribers/3')])
+
+
+class TestFlushingWrites(WriteQueueTestCase):
+
+    def test_should_send_writes_of_url_in_order(self):
+        other = self.entry('/accounts/1/lists/2/subscribers/5')
+        self.queue.move(self.subscriber, self.list_)
+        self.queue.delete(other)
+        self.queue.delete(self.subscriber)
+        self.assertEqual(self.queue._next_batch()[1][0], 2)
+        self.assertEqual(len(self.queue._next_batch()), 2)
+        self.queue.flush()
+        self.assertEqual(
+            [write for write in self.sent() if write[1].endswith('/3')], [
+                ('POST', '/accounts/1/lists/2/subscribers/3'),
+                ('DELETE', '/accounts/1/lists/2/subscribers/3')])
+
+    def test_should_retry_failed_writes(self):
+        self.statuses = [503, 429]
+        self.queue.delete(self.subscriber)
+        self.assertEqual(self.queue.flush(), 1)
+        self.assertEqual(len(self.transport.requests), 3)
+
+    def test_should_keep_writes_that_can_not_succeed(self):
+        self.statuses = [400]
+        self.queue.delete(self.subscriber)
+        self.queue.delete(self.subscriber)
+        self.assertEqual(self.queue.flush(), 1)
+        failed = self.queue.failed()
+        self.assertEqual(len(failed), 1)
+        self.assertEqual(failed[0][1:3], (
+            'DELETE', '/accounts/1/lists/2/subscribers/3'))
+
+    def test_should_give_up_after_max_retries(self):
+        self.queue.max_retries = 1
+        self.statuses = [500, 500]
+        self.queue.delete(self.subscriber)
+        self.queue.flush()
+        self.assertEqual(len(self.queue.failed()), 1)
+
+    def test_should_send_claimed_writes_once(self):
+        self.queue.delete(self.subscriber)
+        queue = WriteQueue(self.adapter, self.path)
+        batch = self.queue._next_batch()
+        self.assertTrue(queue._claim(batch[0][0]))
+        self.assertEqual(self.queue._next_batch(), [])
+        self.assertEqual(self.queue.flush(), 0)
+        self.assertFalse(self.queue._send(batch[0]))
+        self.assertEqual(self.transport.requests, [])
+
+    def test_should_send_writes_of_expired_claims(self):
+        self.queue.delete(self.subscriber)
+        self.queue._claim(self.queue._next_batch()[0][0])
+        self.queue.claim_timeout = -1
+        self.assertEqual(self.queue.flush(), 1)
+
+    def test_should_keep_flushing_in_background_after_errors(self):
+        flush, calls = self.queue.flush, []
+
+        def failing_flush():
+            calls.append(1)
+            if len(calls) == 1:
+                raise EnvironmentError('database is locked')
+            return flush()
+
+        self.queue.flush = failing_flush
+        self.queue.start(interval=0.01)
+        self.queue.delete(self.subscriber)
+        for _ in range(200):
+            if self.transport.requests:
+                break
+            time.sleep(0.01)
+        self.queue.stop(flush=False)
+        self.assertEqual(len(self.transport.requests), 1)
+
+    def test_should_send_writes_in_background(self):
+        self.queue.start(interval=0.01)
+        self.queue.delete(self.subscriber)
+        self.queue.stop()
+        self.assertEqual(len(self.queue), 0)
+        self.assertEqual(len(self.transport.requests), 1)